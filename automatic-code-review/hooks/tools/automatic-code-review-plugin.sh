@@ -19,8 +19,44 @@ if [[ -z "$COMMAND" ]]; then
   exit 1
 fi
 
-timestamp() {
-  date -u +"%Y-%m-%dT%H:%M:%SZ"
+# Event store for a session. The JSONL log is append-only. Small files sit
+# next to it so the Stop hook only reads events it hasn't seen:
+#   .cursor      - byte offset just past the last review_triggered or
+#                  review_skipped event
+#   .pending     - files modified since that event, one per line
+#   .reviewed    - JSON map of file path -> content hash at its last review
+#   .last-review - epoch seconds of the last review_triggered event
+set_event_store_paths() {
+  local session_id="$1"
+  LOG_FILE="/tmp/event-log-${session_id}.jsonl"
+  CURSOR_FILE="/tmp/event-log-${session_id}.cursor"
+  PENDING_FILE="/tmp/event-log-${session_id}.pending"
+  REVIEWED_FILE="/tmp/event-log-${session_id}.reviewed"
+  LAST_REVIEW_FILE="/tmp/event-log-${session_id}.last-review"
+}
+
+# Rebuild the cursor and pending index from the log if either is missing
+# (a log written by an older version of this hook, or a cleaned /tmp).
+# Only the events after the stored cursor are read.
+ensure_event_index() {
+  [[ -f "$CURSOR_FILE" && -f "$PENDING_FILE" ]] && return 0
+
+  local cursor=0
+  [[ -f "$CURSOR_FILE" ]] && cursor=$(<"$CURSOR_FILE")
+
+  if [[ -s "$LOG_FILE" ]]; then
+    # Advance the cursor past any review events after it
+    cursor=$(tail -c +$((cursor + 1)) "$LOG_FILE" | LC_ALL=C awk -v offset="$cursor" '
+      BEGIN { cursor = offset }
+      { offset += length($0) + 1 }
+      /"event":"review_(triggered|skipped)"/ { cursor = offset }
+      END { print cursor }')
+    tail -c +$((cursor + 1)) "$LOG_FILE" | jq -r 'select(.event == "file_modified") | .file' > "$PENDING_FILE"
+  else
+    : > "$PENDING_FILE"
+  fi
+
+  echo "$cursor" > "$CURSOR_FILE"
 }
 
 log_event() {
@@ -28,148 +64,209 @@ log_event() {
   local event_type="$2"
   shift 2
 
-  local log_file="/tmp/event-log-${session_id}.jsonl"
-  touch "$log_file"
+  set_event_store_paths "$session_id"
+  ensure_event_index
 
   local event_json
   case "$event_type" in
     file_modified)
+      # The event line is built by cmd_log's single payload parse
       local file="$1"
-      local tool="$2"
-      event_json=$(jq -nc \
-        --arg ts "$(timestamp)" \
-        --arg event "$event_type" \
-        --arg file "$file" \
-        --arg tool "$tool" \
-        '{timestamp: $ts, event: $event, file: $file, tool: $tool}')
+      event_json="$2"
+      echo "$event_json" >> "$LOG_FILE"
+      printf '%s\n' "$file" >> "$PENDING_FILE"
       ;;
 
-    review_triggered)
+    review_triggered|review_skipped)
       local files="$1"
       event_json=$(jq -nc \
-        --arg ts "$(timestamp)" \
         --arg event "$event_type" \
         --argjson files "$files" \
-        '{timestamp: $ts, event: $event, files: $files}')
+        '{timestamp: (now | todate), event: $event, files: $files}')
+      echo "$event_json" >> "$LOG_FILE"
+      wc -c < "$LOG_FILE" | tr -d ' ' > "$CURSOR_FILE"
+      : > "$PENDING_FILE"
       ;;
 
     *)
       return 1
       ;;
   esac
-
-  echo "$event_json" >> "$log_file"
 }
 
 has_new_files() {
   local session_id="$1"
-  local log_file="/tmp/event-log-${session_id}.jsonl"
+  set_event_store_paths "$session_id"
 
-  [[ ! -f "$log_file" ]] && return 1
+  [[ ! -f "$LOG_FILE" ]] && return 1
 
-  local last_idx=-1
-  local idx=0
+  ensure_event_index
+  [[ -s "$PENDING_FILE" ]]
+}
 
-  while IFS= read -r line; do
-    if [[ -n "$line" ]] && echo "$line" | jq -e '.event == "review_triggered"' >/dev/null 2>&1; then
-      last_idx=$idx
-    fi
-    ((idx++)) || true
-  done < "$log_file"
-
-  idx=0
-  while IFS= read -r line; do
-    if [[ $idx -gt $last_idx ]] && [[ -n "$line" ]]; then
-      if echo "$line" | jq -e '.event == "file_modified"' >/dev/null 2>&1; then
-        return 0
-      fi
+# Given a JSON array of files, print two JSON lines: the files whose content
+# differs from the last reviewed version, and the reviewed map updated with
+# the current hashes. Deleted files hash as "deleted". A file git can't hash
+# is always selected and left out of the map, so it is never marked reviewed.
+select_changed_files() {
+  local files_json="$1"
+  local -a files=() existing=() existing_hashes=() hashes=()
+  local file hash
+
+  while IFS= read -r file; do
+    files+=("$file")
+    [[ -f "$file" ]] && existing+=("$file")
+  done < <(jq -r '.[]' <<< "$files_json")
+
+  if [[ ${#existing[@]} -gt 0 ]]; then
+    while IFS= read -r hash; do
+      existing_hashes+=("$hash")
+    done < <(git hash-object -- "${existing[@]}" 2>/dev/null)
+  fi
+
+  # hash-object stops at the first unreadable file; hash one at a time then
+  if [[ ${#existing_hashes[@]} -ne ${#existing[@]} ]]; then
+    existing_hashes=()
+    for file in "${existing[@]}"; do
+      hash=$(git hash-object -- "$file" 2>/dev/null) || hash=""
+      existing_hashes+=("${hash:-unhashable}")
+    done
+  fi
+
+  local i=0
+  for file in "${files[@]}"; do
+    if [[ -f "$file" ]]; then
+      hashes+=("${existing_hashes[$i]}")
+      ((i++)) || true
+    else
+      hashes+=("deleted")
     fi
-    ((idx++)) || true
-  done < "$log_file"
+  done
 
-  return 1
+  local reviewed="{}"
+  [[ -s "$REVIEWED_FILE" ]] && reviewed=$(<"$REVIEWED_FILE")
+
+  jq -nc --argjson reviewed "$reviewed" --arg hashes "$(printf '%s\n' "${hashes[@]}")" '
+    [$ARGS.positional, ($hashes | split("\n"))] | transpose
+    | map({key: .[0], value: .[1]}) | from_entries
+    | ([to_entries[] | select(.value == "unhashable" or $reviewed[.key] != .value) | .key]),
+      ($reviewed + . | with_entries(select(.value != "unhashable")))
+  ' --args "${files[@]}"
 }
 
 get_modified_files() {
   local session_id="$1"
-  local log_file="/tmp/event-log-${session_id}.jsonl"
-
-  [[ ! -f "$log_file" ]] && echo "[]" && return
+  set_event_store_paths "$session_id"
 
-  local last_idx=-1
-  local idx=0
-
-  while IFS= read -r line; do
-    if [[ -n "$line" ]] && echo "$line" | jq -e '.event == "review_triggered"' >/dev/null 2>&1; then
-      last_idx=$idx
-    fi
-    ((idx++)) || true
-  done < "$log_file"
-
-  local -a files=()
-  idx=0
-  while IFS= read -r line; do
-    if [[ $idx -gt $last_idx ]] && [[ -n "$line" ]]; then
-      if echo "$line" | jq -e '.event == "file_modified"' >/dev/null 2>&1; then
-        local file=$(echo "$line" | jq -r '.file')
-        files+=("$file")
-      fi
-    fi
-    ((idx++)) || true
-  done < "$log_file"
+  [[ ! -f "$LOG_FILE" ]] && echo "[]" && return
 
-  printf '%s\n' "${files[@]}" | sort -u | jq -R . | jq -s .
+  ensure_event_index
+  jq -Rn '[inputs | select(length > 0)] | unique' < "$PENDING_FILE"
 }
 
-get_or_initialize_plugin_settings() {
+initialize_plugin_settings() {
   local session_id="$1"
-
-  local settings_file="${PROJECT_ROOT}/.claude/settings.json"
+  local settings_file="$2"
   local rules_file="${PROJECT_ROOT}/.claude/automatic-code-review/rules.md"
 
-  if [[ ! -f "$settings_file" ]] || ! jq -e '.automaticCodeReview' "$settings_file" >/dev/null 2>&1; then
-    local init_flag="/tmp/code-review-initialized-${session_id}"
-    if [[ ! -f "$init_flag" ]]; then
-      mkdir -p "${PROJECT_ROOT}/.claude/automatic-code-review"
-
-      local existing
-      if [[ -f "$settings_file" ]]; then
-        existing=$(cat "$settings_file")
-      else
-        existing="{}"
-      fi
+  local init_flag="/tmp/code-review-initialized-${session_id}"
+  [[ -f "$init_flag" ]] && return 0
 
-      echo "$existing" | jq '.automaticCodeReview = {"enabled": true, "fileExtensions": ["ts", "tsx"], "rulesFile": ".claude/automatic-code-review/rules.md"}' > "$settings_file"
+  mkdir -p "${PROJECT_ROOT}/.claude/automatic-code-review"
 
-      if [[ ! -f "$rules_file" ]]; then
-        cp "${CLAUDE_PLUGIN_ROOT}/default-rules.md" "$rules_file" 2>/dev/null || true
-      fi
+  local existing
+  if [[ -f "$settings_file" ]]; then
+    existing=$(cat "$settings_file")
+  else
+    existing="{}"
+  fi
 
-      echo "✅ automatic-code-review plugin initialized!" >&2
-      echo "   Updated: .claude/settings.json" >&2
-      echo "   Created: .claude/automatic-code-review/rules.md (default rules)" >&2
-      echo "   Customize .claude/automatic-code-review/rules.md for your project." >&2
+  echo "$existing" | jq '.automaticCodeReview = {"enabled": true, "fileExtensions": ["ts", "tsx"], "rulesFile": ".claude/automatic-code-review/rules.md"}' > "$settings_file"
 
-      touch "$init_flag"
-    fi
+  if [[ ! -f "$rules_file" ]]; then
+    cp "${CLAUDE_PLUGIN_ROOT}/default-rules.md" "$rules_file" 2>/dev/null || true
   fi
 
-  jq -r '.automaticCodeReview' "$settings_file"
+  echo "✅ automatic-code-review plugin initialized!" >&2
+  echo "   Updated: .claude/settings.json" >&2
+  echo "   Created: .claude/automatic-code-review/rules.md (default rules)" >&2
+  echo "   Customize .claude/automatic-code-review/rules.md for your project." >&2
+
+  touch "$init_flag"
 }
 
-cmd_log() {
-  INPUT=$(cat)
+# Sets ENABLED ("true"/"false"), EXTENSIONS ("ts|tsx") and
+# MIN_REVIEW_INTERVAL (seconds, 0 = no debounce) from the project's settings.
+# The resolved values are cached per session and reused while
+# .claude/settings.json is not newer than the cache, so the common path reads
+# one small file with shell builtins instead of running jq.
+load_plugin_settings() {
+  local session_id="$1"
+  local settings_file="${PROJECT_ROOT}/.claude/settings.json"
+  local cache_file="/tmp/code-review-settings-${session_id}"
+
+  if [[ -f "$cache_file" && -f "$settings_file" && ! "$settings_file" -nt "$cache_file" ]]; then
+    local cached_settings_file=""
+    ENABLED=""
+    EXTENSIONS=""
+    MIN_REVIEW_INTERVAL=""
+    {
+      IFS= read -r cached_settings_file
+      IFS= read -r ENABLED
+      IFS= read -r EXTENSIONS
+      IFS= read -r MIN_REVIEW_INTERVAL
+    } < "$cache_file" || true
+    [[ "$cached_settings_file" == "$settings_file" && -n "$ENABLED" && -n "$MIN_REVIEW_INTERVAL" ]] && return 0
+  fi
 
-  TOOL_NAME=$(echo "$INPUT" | jq -r '.tool_name // ""')
-  SESSION_ID=$(echo "$INPUT" | jq -r '.session_id // ""')
-  FILE_PATH=$(echo "$INPUT" | jq -r '.tool_input.file_path // ""')
+  local settings_query='.automaticCodeReview
+    | if . == null then "missing"
+      else (if .enabled == false then "false" else "true" end),
+           ((.fileExtensions // []) | join("|")),
+           ((.minReviewIntervalSeconds // 0) | floor | tostring)
+      end'
+
+  local resolved=""
+  [[ -f "$settings_file" ]] && resolved=$(jq -r "$settings_query" "$settings_file" 2>/dev/null || true)
+  if [[ -z "$resolved" || "$resolved" == "missing" ]]; then
+    initialize_plugin_settings "$session_id" "$settings_file"
+    resolved=$(jq -r "$settings_query" "$settings_file" 2>/dev/null || true)
+  fi
 
-  [[ -z "$SESSION_ID" ]] && exit 0
+  ENABLED=""
+  EXTENSIONS=""
+  MIN_REVIEW_INTERVAL=""
+  { IFS= read -r ENABLED; IFS= read -r EXTENSIONS; IFS= read -r MIN_REVIEW_INTERVAL; } <<< "$resolved" || true
+  if [[ "$ENABLED" == "missing" || -z "$ENABLED" ]]; then
+    ENABLED=true
+    EXTENSIONS=""
+    MIN_REVIEW_INTERVAL=0
+    return 0
+  fi
+  [[ "$MIN_REVIEW_INTERVAL" =~ ^[0-9]+$ ]] || MIN_REVIEW_INTERVAL=0
 
-  SETTINGS=$(get_or_initialize_plugin_settings "$SESSION_ID")
-  ENABLED=$(echo "$SETTINGS" | jq -r '.enabled // true')
+  printf '%s\n%s\n%s\n%s\n' "$settings_file" "$ENABLED" "$EXTENSIONS" "$MIN_REVIEW_INTERVAL" > "${cache_file}.$$"
+  mv -f "${cache_file}.$$" "$cache_file"
+}
 
-  [[ "$ENABLED" != "true" ]] && exit 0
+cmd_log() {
+  INPUT=$(cat)
+
+  # One jq run: tool name, session id, file path and the ready-to-append
+  # event line, NUL-separated
+  local event_json
+  {
+    IFS= read -r -d '' TOOL_NAME
+    IFS= read -r -d '' SESSION_ID
+    IFS= read -r -d '' FILE_PATH
+    IFS= read -r -d '' event_json
+  } < <(jq -j '
+    (.tool_name // "") as $tool | (.tool_input.file_path // "") as $file
+    | $tool, "\u0000", (.session_id // ""), "\u0000", $file, "\u0000",
+      ({timestamp: (now | todate), event: "file_modified", file: $file, tool: $tool} | tojson), "\u0000"
+  ' <<< "$INPUT" 2>/dev/null) || true
+
+  [[ -z "${SESSION_ID:-}" ]] && exit 0
 
   case "$TOOL_NAME" in
     Write|Edit|MultiEdit) ;;
@@ -178,13 +275,16 @@ cmd_log() {
 
   [[ -z "$FILE_PATH" ]] && exit 0
 
-  EXTENSIONS=$(echo "$SETTINGS" | jq -r '.fileExtensions | join("|")' 2>/dev/null || echo "")
-  if [[ -z "$EXTENSIONS" ]]; then
-    exit 0
-  fi
+  load_plugin_settings "$SESSION_ID"
+
+  [[ "$ENABLED" != "true" ]] && exit 0
+  [[ -z "$EXTENSIONS" ]] && exit 0
+
+  local -a extensions
+  IFS='|' read -r -a extensions <<< "$EXTENSIONS"
 
   FILE_MATCHES=false
-  for ext in $(echo "$EXTENSIONS" | tr '|' ' '); do
+  for ext in "${extensions[@]}"; do
     if [[ "$FILE_PATH" == *".$ext" ]]; then
       FILE_MATCHES=true
       break
@@ -193,7 +293,7 @@ cmd_log() {
 
   [[ "$FILE_MATCHES" = false ]] && exit 0
 
-  log_event "$SESSION_ID" file_modified "$FILE_PATH" "$TOOL_NAME" || true
+  log_event "$SESSION_ID" file_modified "$FILE_PATH" "$event_json" || true
 
   exit 0
 }
@@ -204,8 +304,7 @@ cmd_review() {
 
   [[ -z "$SESSION_ID" ]] && exit 0
 
-  SETTINGS=$(get_or_initialize_plugin_settings "$SESSION_ID")
-  ENABLED=$(echo "$SETTINGS" | jq -r '.enabled // true')
+  load_plugin_settings "$SESSION_ID"
 
   [[ "$ENABLED" != "true" ]] && exit 0
 
@@ -213,14 +312,34 @@ cmd_review() {
     exit 0
   fi
 
-  FILES_JSON=$(get_modified_files "$SESSION_ID")
-  FILE_COUNT=$(echo "$FILES_JSON" | jq 'length' 2>/dev/null || echo "0")
+  # Debounce: keep collecting files until the interval since the last review
+  # has passed
+  if [[ "$MIN_REVIEW_INTERVAL" -gt 0 && -s "$LAST_REVIEW_FILE" ]]; then
+    if (( $(date +%s) - $(<"$LAST_REVIEW_FILE") < MIN_REVIEW_INTERVAL )); then
+      exit 0
+    fi
+  fi
+
+  MODIFIED_JSON=$(get_modified_files "$SESSION_ID")
+  { IFS= read -r FILES_JSON; IFS= read -r REVIEWED_JSON; } < <(select_changed_files "$MODIFIED_JSON") || true
+  if [[ -z "$FILES_JSON" || -z "$REVIEWED_JSON" ]]; then
+    # Hashing failed: review everything rather than nothing
+    FILES_JSON="$MODIFIED_JSON"
+    REVIEWED_JSON=""
+  fi
 
-  if [[ "$FILE_COUNT" -eq 0 ]]; then
+  if [[ "$FILES_JSON" == "[]" ]]; then
+    # Every modified file is back to content that was already reviewed
+    log_event "$SESSION_ID" review_skipped "$MODIFIED_JSON" || true
     exit 0
   fi
 
   log_event "$SESSION_ID" review_triggered "$FILES_JSON" || true
+  if [[ -n "$REVIEWED_JSON" ]]; then
+    printf '%s\n' "$REVIEWED_JSON" > "${REVIEWED_FILE}.$$"
+    mv -f "${REVIEWED_FILE}.$$" "$REVIEWED_FILE"
+  fi
+  date +%s > "$LAST_REVIEW_FILE"
 
   FILES_LIST=$(echo "$FILES_JSON" | jq -r '.[] | "- " + .' 2>/dev/null || echo "")
 
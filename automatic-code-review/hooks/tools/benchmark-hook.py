@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Hook Benchmark - Replays PostToolUse payloads through the code-review hook
+and reports the latency each edit pays.
+
+Runs inside a throwaway git repository with default plugin settings, under
+a benchmark-only session id, so real session logs are never touched. After
+the replay a single Stop hook (`review`) is timed as well.
+
+Payloads are one JSON object per line, as Claude Code sends them on stdin
+(tool_name, session_id, tool_input.file_path). Without --payloads a
+synthetic stream of edits is generated.
+
+Usage:
+    python3 benchmark-hook.py [--payloads FILE] [--count N]
+                              [--script PATH] [--compare PATH]
+
+    # compare against the previous version of the hook
+    git show HEAD~1:automatic-code-review/hooks/tools/automatic-code-review-plugin.sh > /tmp/old-hook.sh
+    python3 benchmark-hook.py --compare /tmp/old-hook.sh
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+TOOLS_DIR = Path(__file__).resolve().parent
+PLUGIN_ROOT = TOOLS_DIR.parent.parent
+HOOK_SCRIPT = TOOLS_DIR / "automatic-code-review-plugin.sh"
+
+
+def synthetic_payloads(count: int, seed: int = 1) -> List[Dict]:
+    """Edits spread over a few dozen files, mostly matching the default extensions."""
+    rng = random.Random(seed)
+    files = [f"src/module-{i:02d}.{ext}" for i, ext in
+             enumerate(rng.choice(["ts", "ts", "tsx", "md", "json"]) for _ in range(40))]
+    return [
+        {
+            "tool_name": rng.choice(["Edit", "Edit", "Write", "MultiEdit"]),
+            "session_id": "",
+            "tool_input": {"file_path": rng.choice(files)},
+        }
+        for _ in range(count)
+    ]
+
+
+def load_payloads(path: Path) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(script: Path, payloads: List[Dict]) -> Dict:
+    """Run every payload through `script log`, then one `script review`."""
+    session_id = f"hook-benchmark-{uuid.uuid4().hex[:12]}"
+    env = {**os.environ, "CLAUDE_PLUGIN_ROOT": str(PLUGIN_ROOT)}
+
+    with tempfile.TemporaryDirectory() as repo:
+        subprocess.run(["git", "init", "-q", repo], check=True)
+        settings_dir = Path(repo) / ".claude"
+        settings_dir.mkdir()
+        (settings_dir / "settings.json").write_text(json.dumps({
+            "automaticCodeReview": {
+                "enabled": True,
+                "fileExtensions": ["ts", "tsx"],
+                "rulesFile": ".claude/automatic-code-review/rules.md",
+            }
+        }))
+
+        def run(command: str, payload: Dict) -> float:
+            data = json.dumps({**payload, "session_id": session_id})
+            start = time.perf_counter()
+            subprocess.run(["bash", str(script), command], input=data, text=True, cwd=repo, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return (time.perf_counter() - start) * 1000
+
+        try:
+            log_ms = [run("log", payload) for payload in payloads]
+            review_ms = run("review", {})
+        finally:
+            for leftover in glob.glob(f"/tmp/*{session_id}*"):
+                os.remove(leftover)
+
+    log_ms.sort()
+    return {
+        "calls": len(log_ms),
+        "mean_ms": statistics.mean(log_ms),
+        "p50_ms": log_ms[len(log_ms) // 2],
+        "p95_ms": log_ms[int(len(log_ms) * 0.95)],
+        "total_ms": sum(log_ms),
+        "review_ms": review_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay hook payloads through the code-review hook.")
+    parser.add_argument("--payloads", type=Path, help="JSONL file of recorded PostToolUse payloads")
+    parser.add_argument("--count", type=int, default=200, help="synthetic payloads to generate (default: 200)")
+    parser.add_argument("--script", type=Path, default=HOOK_SCRIPT, help="hook script to benchmark")
+    parser.add_argument("--compare", type=Path, help="second hook script to benchmark on the same payloads")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads) if args.payloads else synthetic_payloads(args.count)
+    if not payloads:
+        parser.error("no payloads to replay")
+
+    scripts = [args.script] + ([args.compare] if args.compare else [])
+    print(f"{len(payloads)} payloads\n")
+    print(f"{'script':<40} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'total ms':>10} {'review ms':>10}")
+    for script in scripts:
+        r = replay(script, payloads)
+        print(f"{str(script)[-40:]:<40} {r['mean_ms']:>8.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['total_ms']:>10.1f} {r['review_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
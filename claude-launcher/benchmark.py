@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Prompt Assembly Benchmark - Times the Claude launcher and the OpenCode
+generator on the real persona library or a synthetic one.
+
+Both tools compile personas through prompt_assembly.py. Each case is run
+cold (caches cleared before every round) and warm (caches populated), and
+records wall time, peak Python memory and the number of files opened:
+
+- load_prompts:        catalog discovery and shortcut maps
+- process_imports:     compile every solo persona for Claude Code
+- load_team_from_yaml: compile every team (members and lead)
+- generation:          full OpenCode agent generation
+
+The real-library run also checks that both tools produce the same prompt
+apart from the target header. Synthetic libraries are generated in a temp
+directory, so results are comparable across branches and machines; use
+--output to save them and --compare to diff against a saved run.
+
+Usage:
+    python3 benchmark.py [--rounds N] [--output results.json]
+    python3 benchmark.py --synthetic [--personas N] [--skills N] [--imports N]
+                         [--teams N] [--members N] [--nesting N] [--large-kb N]
+                         [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import prompt_assembly
+from prompt_assembly import (
+    CACHE_OFF,
+    CACHE_USE,
+    CLAUDE_CODE_TARGET,
+    OPENCODE_TARGET,
+    compile_prompt,
+    load_catalog,
+)
+
+LAUNCHER_DIR = Path(__file__).resolve().parent.parent
+
+# Files opened while a measured round runs, counted via the "open" audit event
+_opens = {"active": False, "count": 0}
+
+
+def _audit_open(event: str, args) -> None:
+    if event == "open" and _opens["active"]:
+        _opens["count"] += 1
+
+
+def load_script(path: Path, module_name: str):
+    """Import a script whose filename isn't a valid module name."""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# ============================================================================
+# Synthetic Library
+# ============================================================================
+
+def _filler(kb: int, label: str) -> str:
+    line = f"- {label}: guidance that stands in for real persona and skill prose.\n"
+    return line * max(1, kb * 1024 // len(line))
+
+
+def synthesize_library(root: Path, options: argparse.Namespace) -> Dict:
+    """
+    Write a synthetic prompt library under root and return its parameters.
+
+    Mirrors the real layout: personas alternate between a local and a global
+    system-prompts directory, skills live in skills/<name>/SKILL.md (skill i
+    imports the next --nesting skills), and teams are teams/<name>/team.yaml
+    with a sibling lead and members drawn from the personas. Every tenth
+    persona is padded to --large-kb.
+    """
+    rng = random.Random(options.seed)
+    local_dir = root / "system-prompts"
+    global_dir = root / "global" / "system-prompts"
+    skills_dir = root / "skills"
+    for directory in (local_dir, global_dir, skills_dir):
+        directory.mkdir(parents=True)
+
+    def skill_imports() -> str:
+        picks = rng.sample(range(options.skills), min(options.imports, options.skills))
+        return "".join(f"- @{skills_dir}/skill-{j:03d}/SKILL.md\n" for j in picks)
+
+    for i in range(options.skills):
+        skill_dir = skills_dir / f"skill-{i:03d}"
+        skill_dir.mkdir()
+        nested = "".join(f"@../skill-{j:03d}/SKILL.md\n"
+                         for j in range(i + 1, min(options.skills, i + 1 + options.nesting)))
+        (skill_dir / "SKILL.md").write_text(
+            f"---\nname: skill-{i:03d}\ndescription: \"Synthetic skill {i}\"\n---\n\n"
+            f"# Skill {i}\n\n{_filler(2, f'skill {i}')}\n{nested}"
+        )
+
+    persona_names = []
+    for i in range(options.personas):
+        name = f"persona-{i:04d}"
+        persona_names.append(name)
+        body = _filler(options.large_kb if i % 10 == 0 else 4, name)
+        (local_dir if i % 2 == 0 else global_dir).joinpath(f"{name}.md").write_text(
+            f"---\nname: Persona {i}\nshortcut: p{i:04d}\ndescription: Synthetic persona {i}\n---\n\n"
+            f"# Persona {i}\n\n{body}\n## Skills\n\n{skill_imports() if options.skills else ''}"
+        )
+
+    for t in range(options.teams):
+        team_dir = local_dir / "teams" / f"team-{t:02d}"
+        team_dir.mkdir(parents=True)
+        (team_dir / "lead.md").write_text(
+            f"---\nname: Lead {t}\n---\n\n# Lead {t}\n\n{skill_imports() if options.skills else ''}"
+        )
+        members = rng.sample(persona_names, min(options.members, len(persona_names)))
+        (team_dir / "team.yaml").write_text(
+            f"name: Team {t}\nshortcut: t{t:02d}\n\nteam:\n  - name: lead\n    model: opus\n"
+            + "".join(f"  - name: {member}\n    model: sonnet\n" for member in members)
+        )
+
+    return {key: getattr(options, key) for key in
+            ("personas", "skills", "imports", "teams", "members", "nesting", "large_kb", "seed")}
+
+
+def isolate(root: Path, launcher, generator, synthetic: bool) -> None:
+    """Point caches and generator output (and, if synthetic, discovery) into root."""
+    cache_dir = root / "cache"
+    for module in (prompt_assembly, launcher):
+        module.CACHE_DIR = cache_dir
+    prompt_assembly.PROMPT_CACHE_DIR = cache_dir / "prompts"
+    launcher.ARTIFACTS_DIR = cache_dir / "artifacts"
+    launcher.BINARIES_CACHE = cache_dir / "binaries.json"
+    generator.OPENCODE_AGENTS_DIR = root / "opencode-agents"
+    generator.MANIFEST_FILE = generator.OPENCODE_AGENTS_DIR / ".generate-opencode-agents.json"
+
+    if synthetic:
+        local_dir = root / "system-prompts"
+        global_dir = root / "global" / "system-prompts"
+        for module in (prompt_assembly, launcher):
+            module.LAUNCHER_DIR = root
+            module.SYSTEM_PROMPTS_DIR = local_dir
+            module.GLOBAL_PROMPTS_DIR = global_dir
+        prompt_assembly.TEAMS_DIR = local_dir / "teams"
+        prompt_assembly.GLOBAL_TEAMS_DIR = global_dir / "teams"
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def measure(run: Callable[[], None], reset: Optional[Callable[[], None]], rounds: int) -> Dict:
+    """
+    Time run() over rounds, calling reset() untimed before each one.
+
+    An extra first round is traced for peak memory and files opened; it is
+    excluded from the timings because tracing slows it down.
+    """
+    timings = []
+    for round_index in range(rounds + 1):
+        if reset:
+            reset()
+        traced = round_index == 0
+        if traced:
+            tracemalloc.start()
+            _opens.update(active=True, count=0)
+        start = time.perf_counter()
+        with redirect_stderr(io.StringIO()), redirect_stdout(io.StringIO()):
+            run()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if traced:
+            _opens["active"] = False
+            peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        else:
+            timings.append(elapsed_ms)
+    timings.sort()
+    return {
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(timings[len(timings) // 2], 3),
+        "peak_kib": round(peak_kib, 1),
+        "files_opened": _opens["count"],
+    }
+
+
+def run_cases(root: Path, launcher, generator, rounds: int) -> Dict:
+    catalog = load_catalog(CACHE_OFF)
+    persona_files = [Path(e["path"]) for e in catalog if e["kind"] == "solo"]
+    team_yamls = [Path(e["path"]) for e in catalog if e["kind"] == "team"]
+    prompt_dirs = [d for d in (launcher.SYSTEM_PROMPTS_DIR, launcher.GLOBAL_PROMPTS_DIR) if d.exists()]
+
+    def clear_caches():
+        shutil.rmtree(root / "cache", ignore_errors=True)
+
+    def clear_generation():
+        clear_caches()
+        shutil.rmtree(root / "opencode-agents", ignore_errors=True)
+
+    def run_load_prompts():
+        launcher.load_prompts(load_catalog(CACHE_USE))
+
+    def run_process_imports():
+        for file_path in persona_files:
+            launcher.process_imports(file_path, file_path.stem, CACHE_USE)
+
+    def run_load_teams():
+        for team_yaml in team_yamls:
+            skill_memo = {}
+            lead_file = launcher.load_team_from_yaml(team_yaml, prompt_dirs, CACHE_USE, skill_memo)[0]
+            launcher.process_imports(lead_file, lead_file.stem, CACHE_USE, skill_memo)
+
+    def run_generation():
+        argv = sys.argv
+        sys.argv = [generator.__file__]
+        try:
+            generator.main()
+        finally:
+            sys.argv = argv
+
+    cases = [
+        ("load_prompts", run_load_prompts, clear_caches),
+        ("process_imports", run_process_imports, clear_caches),
+        ("load_team_from_yaml", run_load_teams, clear_caches),
+        ("generation", run_generation, clear_generation),
+    ]
+
+    results = {}
+    for name, run, reset in cases:
+        if name == "load_team_from_yaml" and not team_yamls:
+            continue
+        cold = measure(run, reset, rounds)
+        warm = measure(run, None, rounds)  # the last cold round left the caches populated
+        results[name] = {"cold": cold, "warm": warm}
+    return results
+
+
+def check_parity(persona_files: List[Path]) -> List[str]:
+    """Return persona files whose launcher and generator prompts differ beyond the header."""
+    mismatches = []
+    with redirect_stderr(io.StringIO()):
+        for file_path in persona_files:
+            claude = compile_prompt(file_path, CACHE_OFF, target=CLAUDE_CODE_TARGET)["prompt"]
+            opencode = compile_prompt(file_path, CACHE_OFF, target=OPENCODE_TARGET)["prompt"]
+            if claude.replace(CLAUDE_CODE_TARGET["precedence"], OPENCODE_TARGET["precedence"]) != opencode:
+                mismatches.append(str(file_path))
+    return mismatches
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark prompt assembly for the launcher and generator.")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per case (default: 5)")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="show median ratios against a saved results file")
+    synthetic = parser.add_argument_group("synthetic library")
+    synthetic.add_argument("--synthetic", action="store_true", help="benchmark a generated library")
+    synthetic.add_argument("--personas", type=int, default=200)
+    synthetic.add_argument("--skills", type=int, default=40)
+    synthetic.add_argument("--imports", type=int, default=8, help="skills imported per persona")
+    synthetic.add_argument("--teams", type=int, default=5)
+    synthetic.add_argument("--members", type=int, default=4, help="members per team besides the lead")
+    synthetic.add_argument("--nesting", type=int, default=1, help="nested imports per skill")
+    synthetic.add_argument("--large-kb", type=int, default=128, help="size of every tenth persona")
+    synthetic.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def print_results(results: Dict, baseline: Optional[Dict]) -> None:
+    print(f"{'case':<21} {'run':<5} {'min ms':>10} {'median ms':>10} {'peak KiB':>10} {'opens':>7}"
+          + (f" {'vs base':>8}" if baseline else ""))
+    for case, runs in results["cases"].items():
+        for label, m in runs.items():
+            row = (f"{case:<21} {label:<5} {m['min_ms']:>10.2f} {m['median_ms']:>10.2f} "
+                   f"{m['peak_kib']:>10.1f} {m['files_opened']:>7}")
+            base = (baseline or {}).get("cases", {}).get(case, {}).get(label)
+            if base and base["median_ms"]:
+                row += f" {m['median_ms'] / base['median_ms']:>7.2f}x"
+            print(row)
+
+
+def main():
+    options = parse_args()
+    rounds = max(1, options.rounds)
+
+    launcher = load_script(LAUNCHER_DIR / "claude-launcher" / "claude-launcher.py", "claude_launcher")
+    generator = load_script(LAUNCHER_DIR / "opencode-launcher" / "generate-opencode-agents.py", "opencode_generator")
+    sys.addaudithook(_audit_open)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        library = synthesize_library(root, options) if options.synthetic else {"path": str(LAUNCHER_DIR)}
+        isolate(root, launcher, generator, options.synthetic)
+
+        results = {
+            "library": library,
+            "rounds": rounds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cases": run_cases(root, launcher, generator, rounds),
+        }
+        if not options.synthetic:
+            solo_files = [Path(e["path"]) for e in load_catalog(CACHE_OFF) if e["kind"] == "solo"]
+            results["parity_mismatches"] = check_parity(solo_files)
+
+    baseline = json.loads(options.compare.read_text()) if options.compare else None
+    print(f"Library: {json.dumps(library)}, {rounds} round(s)\n")
+    print_results(results, baseline)
+
+    if options.output:
+        options.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {options.output}")
+
+    if not options.synthetic:
+        mismatches = results["parity_mismatches"]
+        print()
+        if mismatches:
+            print(f"✗ Output parity: {len(mismatches)} persona(s) differ between targets")
+            for path in mismatches:
+                print(f"  - {path}")
+            sys.exit(1)
+        print("✓ Output parity: launcher and generator prompts match (excluding target header)")
+
+
+if __name__ == "__main__":
+    main()
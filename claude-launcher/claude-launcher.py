@@ -10,28 +10,106 @@ Features:
 - @ reference processing for skill imports
 - Team support: declarative teams via teams/*/team.yaml
 - Worktree passthrough: -w / --worktree [name]
-- Sandbox mode: --sandbox [repo-path] (runs via docker sandbox)
+- Sandbox mode: --sandbox [repo-path] (runs via docker sandbox, reused while warm; --fresh recreates)
+- Compiled prompt cache in ~/.cache/claude-launcher (--no-cache / --rebuild)
+- Startup profiling: --timings (or CLAUDE_LAUNCHER_TIMINGS=1)
+- Prompt size report and token budget: --report, --budget N [--budget-fail]
+- Skill compaction: --compact (drops skill frontmatter and repeated paragraphs)
+- Prefix-cache friendly layout: --stable-layout (shared skills first, fingerprinted)
+- Launch log: each session gets a --session-id recorded with its persona
+- Debug artifacts: content-addressed, written only when changed; --fast skips them
+- Precompiled bundles: cl build [--check] [--force], launched without recompiling
+- Parallel sessions: --fanout tdd,arc,doc [--worktree] -- <task> (one headless session each)
+
+Discovery, @ import processing and caching live in prompt_assembly.py,
+shared with opencode-launcher/generate-opencode-agents.py.
 """
 
+import io
 import json
 import os
+import shutil
 import sys
 import subprocess
-import re
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+
+from prompt_assembly import (
+    CACHE_DIR,
+    CACHE_OFF,
+    CACHE_REBUILD,
+    CACHE_USE,
+    CLAUDE_CODE_TARGET,
+    GLOBAL_PROMPTS_DIR,
+    GLOBAL_TEAMS_DIR,
+    LAUNCHER_DIR,
+    SYSTEM_PROMPTS_DIR,
+    TEAMS_DIR,
+    catalog_by_path,
+    compact_target,
+    compile_prompt,
+    dependencies_fresh,
+    estimate_tokens,
+    fingerprint_dependencies,
+    log_stderr,
+    stable_target,
+    load_catalog,
+    parse_frontmatter,
+    parse_team_yaml,
+    write_atomic,
+    write_content_addressed,
+)
+from timings import count_read, span
+import timings
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
-LAUNCHER_DIR = Path(__file__).parent.parent
-SYSTEM_PROMPTS_DIR = LAUNCHER_DIR / "system-prompts"
-TEAMS_DIR = SYSTEM_PROMPTS_DIR / "teams"
-GLOBAL_PROMPTS_DIR = Path.home() / ".claude" / "system-prompts"
-GLOBAL_TEAMS_DIR = GLOBAL_PROMPTS_DIR / "teams"
-DEBUG_OUTPUT = Path("/tmp/claude-launcher-debug.md")
-DEBUG_AGENTS_OUTPUT = Path("/tmp/claude-launcher-agents.json")
+# Claude Code documents --system-prompt-file for print mode only, so
+# interactive launches pass the prompt inline unless --prompt-file asks
+# otherwise. Print-mode launches (--fanout) switch to a file above this size:
+# exec cost is flat up to ~64 KiB of argv and Linux rejects any single
+# argument over 128 KiB (MAX_ARG_STRLEN).
+ARTIFACTS_DIR = CACHE_DIR / "artifacts"
+ARGV_INLINE_LIMIT = int(os.environ.get("CLAUDE_LAUNCHER_ARGV_LIMIT", 32 * 1024))
+MAX_ARG_STRLEN = 128 * 1024
+
+# Debug copies of the prompt and agents JSON, content-addressed like the
+# prompt files above (by default the very same file, so no extra write).
+DEBUG_DIR = Path(os.environ.get("CLAUDE_LAUNCHER_DEBUG_DIR") or ARTIFACTS_DIR)
+
+# Resolved binary paths, reused while PATH and the binary are unchanged
+BINARIES_CACHE = CACHE_DIR / "binaries.json"
+
+# Ready-to-launch bundles written by `cl build`
+BUNDLES_DIR = CACHE_DIR / "bundles"
+BUNDLE_INDEX = BUNDLES_DIR / "index.json"
+BUNDLE_VERSION = 2
+LAUNCHER_FILE = Path(__file__).resolve()
+
+# One line per launch: session id, persona, model. Read by the session
+# index in session-optimizer to attribute transcripts to personas.
+LAUNCH_LOG = CACHE_DIR / "launches.jsonl"
+# Flags that continue an existing session, which already has an id
+RESUME_FLAGS = {"-r", "--resume", "-c", "--continue", "--session-id"}
+
+# Warm docker sandboxes: which sandbox was built for which repo and template.
+# Reused until the template image changes or --fresh is given.
+SANDBOX_STATE = CACHE_DIR / "sandboxes.json"
+SANDBOX_TEMPLATE = os.environ.get("CLAUDE_LAUNCHER_SANDBOX_TEMPLATE", "docker/sandbox-templates:claude-code")
+
+# Per-run session logs and summary for --fanout
+FANOUT_DIR = Path("/tmp/claude-launcher-fanout")
+
+PROMPT_AUTO = "auto"
+PROMPT_FILE = "file"
+PROMPT_INLINE = "inline"
 
 MODELS = {
     "opus": "opus",
@@ -40,101 +118,9 @@ MODELS = {
 }
 
 # ============================================================================
-# Data Parsing
+# Teams
 # ============================================================================
 
-def parse_frontmatter(file_path: Path) -> Dict[str, str]:
-    """
-    Parse YAML frontmatter from prompt file.
-
-    Extracts key-value pairs between --- delimiters at the start of a file.
-    """
-    metadata = {}
-    try:
-        with open(file_path) as f:
-            first_line = f.readline().strip()
-            if first_line != "---":
-                return metadata
-
-            for line in f:
-                line = line.strip()
-                if line == "---":
-                    break
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    metadata[key.strip()] = value.strip()
-    except Exception as e:
-        print(f"Error parsing {file_path}: {e}", file=sys.stderr)
-
-    return metadata
-
-
-def build_enforcement_index(embedded_metadata: List[Dict[str, str]]) -> str:
-    if not embedded_metadata:
-        return ""
-
-    lines = [
-        "\n---\n",
-        "\n## Skill Activation Protocol\n",
-        f"You have {len(embedded_metadata)} embedded skills. They are ALL active for this session.",
-        "IF A SKILL APPLIES TO YOUR TASK, YOU DO NOT HAVE A CHOICE. YOU MUST USE IT. THIS IS NOT NEGOTIABLE.",
-        "If you catch yourself violating a skill, STOP IMMEDIATELY, re-read the skill, and correct course.",
-        "Before EVERY action, check: does this violate any embedded skill? If yes, DO NOT PROCEED.\n",
-        "### Embedded Skills\n",
-    ]
-    for meta in embedded_metadata:
-        lines.append(f"- **{meta['name']}**: {meta['description']}")
-    return "\n".join(lines) + "\n"
-
-
-def parse_team_yaml(file_path: Path) -> Dict:
-    """
-    Parse a team.yaml file into structured data.
-
-    Expected format:
-        name: Team Name
-        shortcut: xxx
-
-        team:
-          - name: member-one
-            model: opus
-          - name: member-two
-    """
-    result = {"members": []}
-    current_member = None
-    in_team = False
-
-    with open(file_path) as f:
-        for line in f:
-            stripped = line.strip()
-            if not stripped:
-                continue
-
-            if stripped == "team:":
-                in_team = True
-                continue
-
-            if not in_team:
-                if ":" in stripped:
-                    key, value = stripped.split(":", 1)
-                    result[key.strip()] = value.strip()
-                continue
-
-            # Inside team list
-            if stripped.startswith("- name:"):
-                if current_member:
-                    result["members"].append(current_member)
-                name = stripped.split(":", 1)[1].strip()
-                current_member = {"name": name}
-            elif stripped.startswith("model:") and current_member:
-                current_member["model"] = stripped.split(":", 1)[1].strip()
-
-        if current_member:
-            result["members"].append(current_member)
-
-    return result
-
-
 def resolve_team_member(member_name: str, team_dir: Path, prompt_dirs: List[Path]) -> Optional[Path]:
     """
     Resolve a team member name to a .md file.
@@ -157,20 +143,32 @@ def resolve_team_member(member_name: str, team_dir: Path, prompt_dirs: List[Path
     return None
 
 
-def load_team_from_yaml(team_yaml: Path, prompt_dirs: List[Path]) -> Tuple[Path, str, Dict]:
+def load_team_from_yaml(team_yaml: Path, prompt_dirs: List[Path], cache_mode: str = CACHE_USE,
+                        skill_memo: Optional[Dict[str, Dict]] = None,
+                        target: Dict = CLAUDE_CODE_TARGET,
+                        log: Callable[[str], None] = log_stderr) -> Tuple[Path, str, Dict, Optional[str], Dict, List[Path]]:
     """
     Load a team from team.yaml.
 
-    Returns (lead_file, persona_name, agents_dict) where:
+    All members share skill_memo, so a skill imported by several members is
+    read and parsed once. Progress and errors go to log.
+
+    Returns (lead_file, persona_name, agents_dict, lead_model, member_imports, dependencies) where:
     - lead_file: resolved path to the lead's .md file
     - persona_name: team name from yaml
     - agents_dict: {agent_name: {description, prompt, model?}} for non-lead members
+    - lead_model: model from team.yaml for the lead (None if unset)
+    - member_imports: {agent_name: [skill manifest entries]} for non-lead members
+    - dependencies: team.yaml plus every file read to build the members' prompts
     """
+    if skill_memo is None:
+        skill_memo = {}
+
     team_dir = team_yaml.parent
     config = parse_team_yaml(team_yaml)
 
     if not config.get("members"):
-        print(f"\n✗ ERROR: team.yaml has no team members: {team_yaml}", file=sys.stderr)
+        log(f"\n✗ ERROR: team.yaml has no team members: {team_yaml}")
         sys.exit(1)
 
     persona_name = config.get("name", team_dir.name)
@@ -180,19 +178,21 @@ def load_team_from_yaml(team_yaml: Path, prompt_dirs: List[Path]) -> Tuple[Path,
     lead_member = members[0]
     lead_file = resolve_team_member(lead_member["name"], team_dir, prompt_dirs)
     if not lead_file:
-        print(f"\n✗ ERROR: Could not resolve lead '{lead_member['name']}' — checked {team_dir} and system-prompts/", file=sys.stderr)
+        log(f"\n✗ ERROR: Could not resolve lead '{lead_member['name']}' — checked {team_dir} and system-prompts/")
         sys.exit(1)
 
-    print(f"\nLoading team '{persona_name}' from {team_yaml.relative_to(LAUNCHER_DIR)}...", file=sys.stderr)
-    print(f"  ✓ Lead: {lead_member['name']} → {lead_file.name}", file=sys.stderr)
+    log(f"\nLoading team '{persona_name}' from {team_yaml.relative_to(LAUNCHER_DIR)}...")
+    log(f"  ✓ Lead: {lead_member['name']} → {lead_file.name}")
 
     # Remaining members are agents
     agents = {}
+    member_imports = {}
+    dependencies = [team_yaml]
     for member in members[1:]:
         member_name = member["name"]
         member_file = resolve_team_member(member_name, team_dir, prompt_dirs)
         if not member_file:
-            print(f"\n✗ ERROR: Could not resolve member '{member_name}' — checked {team_dir} and system-prompts/", file=sys.stderr)
+            log(f"\n✗ ERROR: Could not resolve member '{member_name}' — checked {team_dir} and system-prompts/")
             sys.exit(1)
 
         # Process the member's file through process_imports (full @ expansion)
@@ -200,12 +200,18 @@ def load_team_from_yaml(team_yaml: Path, prompt_dirs: List[Path]) -> Tuple[Path,
         description = member_meta.get("description", member_meta.get("name", member_name))
         description = description.strip('"').strip("'")
 
-        print(f"  Processing agent: {member_name} → {member_file.name}", file=sys.stderr)
-        processed_prompt = process_imports(member_file, member_name)
+        log(f"  Processing agent: {member_name} → {member_file.name}")
+        compiled = compile_prompt(member_file, cache_mode, skill_memo, target, log=log)
+        member_imports[member_name] = compiled["imports"]
+        dependencies.extend(compiled["dependencies"])
+        if compiled["compaction"]:
+            report_compaction(compiled["compaction"], "    ", log)
+        if compiled["layout"]:
+            report_layout(compiled["layout"], "    ", log)
 
         agent_def = {
             "description": description,
-            "prompt": processed_prompt,
+            "prompt": compiled["prompt"],
         }
 
         if "model" in member:
@@ -218,61 +224,41 @@ def load_team_from_yaml(team_yaml: Path, prompt_dirs: List[Path]) -> Tuple[Path,
             agent_def["tools"] = [t.strip() for t in tools_str.split(",") if t.strip()]
 
         agents[member_name] = agent_def
-        print(f"  ✓ Agent: {member_name}", file=sys.stderr)
+        log(f"  ✓ Agent: {member_name}")
 
-    print(f"\nTeam loaded: 1 lead + {len(agents)} agent(s)", file=sys.stderr)
-    return lead_file, persona_name, agents, lead_member.get("model")
+    log(f"\nTeam loaded: 1 lead + {len(agents)} agent(s)")
+    return lead_file, persona_name, agents, lead_member.get("model"), member_imports, dependencies
 
 
-def load_prompts() -> Tuple[Dict[str, Path], Dict[str, Path]]:
+def load_prompts(catalog: Optional[List[Dict]] = None) -> Tuple[Dict[str, Path], Dict[str, Path], Dict[str, Path]]:
     """
-    Load all system prompts and build shortcut maps.
+    Load all system prompts and build shortcut maps from the catalog.
+
+    Teams are only mapped to their team.yaml here; members are resolved
+    and compiled by load_team_from_yaml once a team is selected.
 
     Returns:
-        (personas_map, names_map) where:
-        - personas_map: shortcut -> file_path
+        (personas_map, names_map, team_yamls) where:
+        - personas_map: shortcut -> file_path (team.yaml path for teams)
         - names_map: name -> file_path
+        - team_yamls: shortcut -> team.yaml path
     """
+    if catalog is None:
+        catalog = load_catalog()
+
     personas = {}
     names = {}
-    team_yamls = {}  # shortcut -> team.yaml Path
-
-    # Search both directories
-    for prompt_dir in [SYSTEM_PROMPTS_DIR, GLOBAL_PROMPTS_DIR]:
-        if not prompt_dir.exists():
-            continue
-
-        # Solo personas: *.md files
-        for file_path in sorted(prompt_dir.glob("*.md")):
-            metadata = parse_frontmatter(file_path)
-
-            if "name" in metadata:
-                names[metadata["name"]] = file_path
-
-            if "shortcut" in metadata:
-                shortcut = metadata["shortcut"]
-                personas[shortcut] = file_path
-
-    # Declarative teams: teams/*/team.yaml
-    for teams_dir in [TEAMS_DIR, GLOBAL_TEAMS_DIR]:
-        if not teams_dir.exists():
-            continue
-
-        for team_dir in sorted(teams_dir.iterdir()):
-            if not team_dir.is_dir():
-                continue
-            team_yaml = team_dir / "team.yaml"
-            if not team_yaml.exists():
-                continue
-
-            config = parse_team_yaml(team_yaml)
-            if "shortcut" in config:
-                shortcut = config["shortcut"]
-                # Store the team.yaml path — we'll resolve the lead file later
-                personas[shortcut] = team_yaml
-                team_yamls[shortcut] = team_yaml
-            if "name" in config:
-                names[config["name"]] = team_yaml
+    team_yamls = {}
+
+    for entry in catalog:
+        file_path = Path(entry["path"])
+        if entry["name"]:
+            names[entry["name"]] = file_path
+        if entry["shortcut"]:
+            # Teams store the team.yaml path — the lead file is resolved later
+            personas[entry["shortcut"]] = file_path
+            if entry["kind"] == "team":
+                team_yamls[entry["shortcut"]] = file_path
 
     return personas, names, team_yamls
 
@@ -282,11 +268,7 @@ def load_prompts() -> Tuple[Dict[str, Path], Dict[str, Path]]:
 
 def has_fzf() -> bool:
     """Check if fzf is available."""
-    try:
-        result = subprocess.run(["which", "fzf"], capture_output=True)
-        return result.returncode == 0
-    except:
-        return False
+    return resolve_binary("fzf") is not None
 
 
 def fzf_select(items: list, prompt: str) -> Optional[str]:
@@ -305,14 +287,41 @@ def fzf_select(items: list, prompt: str) -> Optional[str]:
         return None
 
 
-def interactive_select(personas: Dict[str, Path]) -> Tuple[Path, str]:
+def interactive_select(personas: Dict[str, Path], catalog: List[Dict],
+                       single_picker: bool = False) -> Tuple[Path, str]:
     """
     Interactive 2-step selection: persona, then model.
 
+    Menu labels come from the catalog (no frontmatter re-parsing).
+    With single_picker and fzf available, persona and model are chosen in
+    one fzf session from a combined persona × model list.
+
     Returns:
         (selected_file, selected_model_key)
     """
-    use_fzf = has_fzf()
+    with span("has_fzf"):
+        use_fzf = has_fzf()
+    entries = catalog_by_path(catalog)
+
+    def display_name(file_path: Path) -> str:
+        entry = entries.get(str(file_path))
+        return (entry and entry["name"]) or file_path.stem
+
+    if use_fzf and single_picker:
+        fzf_items = []
+        for shortcut in sorted(personas.keys()):
+            name = display_name(personas[shortcut])
+            for model_key in MODELS:
+                fzf_items.append(f"{len(fzf_items) + 1}) {shortcut:<4} {model_key:<4} → {name}")
+
+        selected = fzf_select(fzf_items, "Select persona & model")
+        if not selected:
+            print("Cancelled")
+            sys.exit(0)
+
+        # Extract shortcut and model key from selection (skip number prefix)
+        selected_shortcut, selected_model = selected.split(")", 1)[1].split("→")[0].split()
+        return personas[selected_shortcut], selected_model
 
     # Step 1: Select persona
     persona_list = sorted(personas.keys())
@@ -321,9 +330,7 @@ def interactive_select(personas: Dict[str, Path]) -> Tuple[Path, str]:
         # Build fzf items with numbers, shortcuts, and names
         fzf_items = []
         for i, shortcut in enumerate(persona_list, 1):
-            file_path = personas[shortcut]
-            metadata = parse_frontmatter(file_path)
-            name = metadata.get("name", file_path.stem)
+            name = display_name(personas[shortcut])
             fzf_items.append(f"{i}) {shortcut:<4} → {name}")
 
         selected = fzf_select(fzf_items, "Select persona")
@@ -339,9 +346,7 @@ def interactive_select(personas: Dict[str, Path]) -> Tuple[Path, str]:
         # Fallback to plain numbered menu
         print("\nSelect persona (or 'q' to cancel):")
         for i, shortcut in enumerate(persona_list, 1):
-            file_path = personas[shortcut]
-            metadata = parse_frontmatter(file_path)
-            name = metadata.get("name", file_path.stem)
+            name = display_name(personas[shortcut])
             print(f"  {i}) {shortcut:<4} → {name}")
 
         while True:
@@ -410,6 +415,7 @@ def extract_passthrough_flags(args: list) -> Tuple[list, list, Optional[str]]:
     Currently supports:
     - -w / --worktree [name]  (name is optional)
     - --sandbox               (sandbox mode: uses cwd, auto-adds --worktree)
+    - -- <args>               (everything after -- goes to Claude Code as is)
 
     Returns:
         (remaining_args, passthrough_flags, sandbox_repo) where:
@@ -424,6 +430,10 @@ def extract_passthrough_flags(args: list) -> Tuple[list, list, Optional[str]]:
     while i < len(args):
         arg = args[i]
 
+        if arg == "--":
+            passthrough.extend(args[i + 1:])
+            break
+
         if arg == "--sandbox":
             sandbox_repo = os.getcwd()
             i += 1
@@ -455,6 +465,112 @@ def extract_passthrough_flags(args: list) -> Tuple[list, list, Optional[str]]:
     return remaining, passthrough, sandbox_repo
 
 
+def parse_token_budget(value: str, source: str) -> int:
+    """A --budget / CLAUDE_LAUNCHER_TOKEN_BUDGET value: a positive whole number of tokens."""
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    print(f"Invalid token budget from {source}: {value!r} (expected a positive whole number)", file=sys.stderr)
+    print("Usage: cl [persona] [model] --budget <tokens> [--budget-fail]", file=sys.stderr)
+    sys.exit(1)
+
+
+def extract_launcher_flags(args: list) -> Tuple[list, Dict]:
+    """
+    Extract flags consumed by the launcher itself (never passed to Claude Code).
+
+    Currently supports:
+    - --no-cache  (compile from sources, don't read or write the prompt cache)
+    - --rebuild   (compile from sources and refresh the prompt cache)
+    - --prompt-file / --prompt-inline  (force how the system prompt is passed;
+      default is inline, or a file above ARGV_INLINE_LIMIT bytes in print mode)
+    - --single-picker        (choose persona and model in one fzf session)
+    - --timings              (print per-phase startup timings to stderr)
+    - --timings-json <path>  (also append them as a JSON line to path)
+    - --compact              (compact imported skills, see compact_target)
+    - --stable-layout        (stable skills first for prompt-prefix caching)
+    - --report               (print the prompt size ledger and exit)
+    - --budget <tokens>      (warn when a prompt exceeds this many tokens)
+    - --budget-fail          (refuse to launch instead of warning)
+    - --fanout <a,b,c>       (run one headless session per persona, see run_fanout)
+    - --fresh                (recreate the docker sandbox from a freshly pulled template)
+    - --fast                 (skip debug artifacts)
+
+    $CLAUDE_LAUNCHER_TIMINGS=1, $CLAUDE_LAUNCHER_TIMINGS_JSONL=<path>,
+    $CLAUDE_LAUNCHER_SINGLE_PICKER=1, $CLAUDE_LAUNCHER_TOKEN_BUDGET=<tokens>,
+    $CLAUDE_LAUNCHER_BUDGET_FAIL=1, $CLAUDE_LAUNCHER_COMPACT=1 and
+    $CLAUDE_LAUNCHER_STABLE_LAYOUT=1 and $CLAUDE_LAUNCHER_FAST=1 are equivalent
+    to the matching flags.
+
+    Returns:
+        (remaining_args, options)
+    """
+    remaining = []
+    timings_jsonl = os.environ.get("CLAUDE_LAUNCHER_TIMINGS_JSONL")
+    token_budget = os.environ.get("CLAUDE_LAUNCHER_TOKEN_BUDGET")
+    options = {
+        "cache_mode": CACHE_USE,
+        "prompt_transport": PROMPT_AUTO,
+        "timings": bool(os.environ.get("CLAUDE_LAUNCHER_TIMINGS") or timings_jsonl),
+        "timings_jsonl": Path(timings_jsonl) if timings_jsonl else None,
+        "single_picker": bool(os.environ.get("CLAUDE_LAUNCHER_SINGLE_PICKER")),
+        "report": False,
+        "token_budget": parse_token_budget(token_budget, "CLAUDE_LAUNCHER_TOKEN_BUDGET") if token_budget else None,
+        "budget_fail": bool(os.environ.get("CLAUDE_LAUNCHER_BUDGET_FAIL")),
+        "compact": bool(os.environ.get("CLAUDE_LAUNCHER_COMPACT")),
+        "stable_layout": bool(os.environ.get("CLAUDE_LAUNCHER_STABLE_LAYOUT")),
+        "fanout": None,
+        "fresh_sandbox": False,
+        "fast": bool(os.environ.get("CLAUDE_LAUNCHER_FAST")),
+    }
+
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if arg == "--":
+            # Flags after -- belong to Claude Code
+            remaining.extend(args[i - 1:])
+            break
+        elif arg == "--timings":
+            options["timings"] = True
+        elif arg == "--fanout" and i < len(args):
+            options["fanout"] = [shortcut for shortcut in args[i].split(",") if shortcut]
+            i += 1
+        elif arg == "--fresh":
+            options["fresh_sandbox"] = True
+        elif arg == "--fast":
+            options["fast"] = True
+        elif arg == "--single-picker":
+            options["single_picker"] = True
+        elif arg == "--timings-json" and i < len(args):
+            options["timings"] = True
+            options["timings_jsonl"] = Path(args[i])
+            i += 1
+        elif arg == "--compact":
+            options["compact"] = True
+        elif arg == "--stable-layout":
+            options["stable_layout"] = True
+        elif arg == "--report":
+            options["report"] = True
+        elif arg == "--budget" and i < len(args):
+            options["token_budget"] = parse_token_budget(args[i], "--budget")
+            i += 1
+        elif arg == "--budget-fail":
+            options["budget_fail"] = True
+        elif arg == "--no-cache":
+            options["cache_mode"] = CACHE_OFF
+        elif arg == "--rebuild":
+            options["cache_mode"] = CACHE_REBUILD
+        elif arg == "--prompt-file":
+            options["prompt_transport"] = PROMPT_FILE
+        elif arg == "--prompt-inline":
+            options["prompt_transport"] = PROMPT_INLINE
+        else:
+            remaining.append(arg)
+
+    return remaining, options
+
+
 def resolve_args(args: list, personas: Dict[str, Path]) -> Tuple[Path, str]:
     """
     Resolve command-line arguments to (persona_file, model_key).
@@ -521,115 +637,259 @@ def resolve_args(args: list, personas: Dict[str, Path]) -> Tuple[Path, str]:
 # Import Processing
 # ============================================================================
 
-def process_imports(file_path: Path, persona_name: str) -> str:
-    """
-    Process @ references in system prompt file.
+def process_imports(file_path: Path, persona_name: str, cache_mode: str = CACHE_USE,
+                    skill_memo: Optional[Dict[str, Dict]] = None) -> str:
+    """Build the system prompt for a persona file (see compile_prompt)."""
+    return compile_prompt(file_path, cache_mode, skill_memo, CLAUDE_CODE_TARGET)["prompt"]
+
+
+def report_shared_skills(member_imports: Dict[str, List[Dict]], log: Callable[[str], None] = log_stderr) -> None:
+    """Print which skills each team member shares with other members."""
+    users = {}
+    for member, imports in member_imports.items():
+        for imp in imports:
+            users.setdefault(imp["id"], []).append(member)
 
-    - Skips frontmatter (---...---)
-    - Expands @ references to skill content
-    - Adds header with skill manifest
-    - Adds persona prefix instruction
+    shared = {skill_id for skill_id, members in users.items() if len(members) > 1}
+    log(f"\nSkills: {len(users)} distinct across {len(member_imports)} member(s), {len(shared)} shared")
+    for member, imports in member_imports.items():
+        member_shared = [imp["id"].split(":", 1)[1] for imp in imports if imp["id"] in shared]
+        if member_shared:
+            log(f"  {member}: {', '.join(member_shared)}")
+
+
+# ============================================================================
+# Size Report
+# ============================================================================
+
+def print_size_report(title: str, sections: List[Dict]) -> None:
+    """Print the size ledger of a compiled prompt: bytes and ~tokens per section."""
+    total = sum(section["bytes"] for section in sections) or 1
+    labels = [section["name"] if section["kind"] != "skill" else f"skill: {section['name']}"
+              for section in sections]
+    width = max([len(label) for label in labels] + [len("section")])
+
+    print(f"\n{title}")
+    print(f"  {'section':<{width}} {'bytes':>9} {'~tokens':>9} {'share':>7}")
+    for label, section in zip(labels, sections):
+        print(f"  {label:<{width}} {section['bytes']:>9} {estimate_tokens(section['bytes']):>9} "
+              f"{section['bytes'] * 100 / total:>6.1f}%")
+    print(f"  {'total':<{width}} {total:>9} {estimate_tokens(total):>9}")
+
+
+def report_compaction(compaction: Dict, indent: str = "", log: Callable[[str], None] = log_stderr) -> None:
+    """Print the bytes the compaction pass removed from a prompt."""
+    saved = sum(compaction.values())
+    log(f"{indent}Compaction saved {saved} bytes (~{estimate_tokens(saved)} tokens): "
+        f"frontmatter {compaction['frontmatter']}, duplicates {compaction['duplicates']}, "
+        f"whitespace {compaction['whitespace']}")
+
+
+def report_layout(layout: Dict, indent: str = "", log: Callable[[str], None] = log_stderr) -> None:
+    """Print the size and fingerprint of a stable-layout prompt's shared prefix."""
+    size = layout["stable_prefix_bytes"]
+    log(f"{indent}Stable prefix: {size} bytes (~{estimate_tokens(size)} tokens), "
+        f"fingerprint {layout['fingerprint']}")
+
+
+def check_token_budget(prompts: Dict[str, str], options: Dict) -> bool:
     """
-    result = []
-    imports = []
-    embedded_metadata = []
-    errors = []
-
-    with open(file_path) as f:
-        first_line = f.readline().strip()
-        if first_line == "---":
-            for line in f:
-                if line.strip() == "---":
-                    break
-        else:
-            result.append(first_line + "\n")
-
-        for line in f:
-            match = re.match(r'^\s*-?\s*@([^\s]+)\s*$', line)
-            if match:
-                import_path = match.group(1)
-                import_path = import_path.replace("~", str(Path.home()))
-                if not import_path.startswith("/"):
-                    import_path = str(file_path.parent / import_path)
-
-                import_path = Path(import_path)
-                if import_path.exists():
-                    skill_dir = import_path.parent.name if import_path.name == "SKILL.md" else import_path.stem
-                    print(f"  ✓ Found: {skill_dir}", file=sys.stderr)
-                    skill_meta = parse_frontmatter(import_path)
-                    skill_id = f"development-skills:{skill_dir}"
-                    display_name = skill_meta.get("name", skill_dir)
-                    imports.append({"id": skill_id, "display_name": display_name})
-                    if "description" in skill_meta:
-                        embedded_metadata.append({
-                            "name": skill_id,
-                            "description": skill_meta["description"].strip('"').strip("'"),
-                        })
-                    with open(import_path) as skill_file:
-                        result.append(skill_file.read())
-                        result.append("\n\n")
-                else:
-                    print(f"  ✗ ERROR: Import file not found: {import_path}", file=sys.stderr)
-                    errors.append(str(import_path))
-            else:
-                result.append(line)
+    Compare each prompt's estimated tokens with the configured budget.
 
-    if errors:
-        print(f"\nERROR: Failed to load {len(errors)} import(s):", file=sys.stderr)
-        for err in errors:
-            print(f"  - {err}", file=sys.stderr)
+    Prints a warning per prompt over budget and returns False if any is;
+    with --budget-fail the launcher exits instead.
+    """
+    budget = options["token_budget"]
+    if budget is None:
+        return True
+
+    over = {name: estimate_tokens(len(prompt.encode("utf-8"))) for name, prompt in prompts.items()}
+    over = {name: tokens for name, tokens in over.items() if tokens > budget}
+    for name, tokens in over.items():
+        marker = "✗ ERROR" if options["budget_fail"] else "⚠ WARNING"
+        print(f"\n{marker}: {name} is ~{tokens} tokens, over the {budget}-token budget "
+              f"by ~{tokens - budget}", file=sys.stderr)
+    if over and options["budget_fail"] and not options["report"]:
+        print("  Run with --report to see which sections dominate.", file=sys.stderr)
         sys.exit(1)
+    return not over
 
-    header = "---\n"
+# ============================================================================
+# Claude Code Arguments
+# ============================================================================
 
-    if imports:
-        print(f"\nLoaded {len(imports)} skill(s) successfully", file=sys.stderr)
-        header += "\n# Loaded Skills\n\n"
-        header += "The following skills have been loaded and are active for this session:\n\n"
-        for imp in imports:
-            header += f"- **{imp['display_name']}** ({imp['id']})\n"
-        header += "\n---\n\n"
+def system_prompt_flags(system_prompt: str, transport: str, print_mode: bool = False) -> List[str]:
+    """
+    Build the flags that hand the system prompt to Claude Code.
+
+    With --prompt-file, or for a large prompt in print mode (the only mode
+    Claude Code documents --system-prompt-file for), the prompt is written
+    to a content-addressed file under ARTIFACTS_DIR, keeping argv (and `ps`
+    output) small. An unchanged prompt reuses its existing file. Inline
+    prompts are checked against the per-argument limit up front instead of
+    failing inside exec with E2BIG.
+    """
+    size = len(system_prompt.encode("utf-8"))
+    use_file = transport == PROMPT_FILE or (transport == PROMPT_AUTO and print_mode and size > ARGV_INLINE_LIMIT)
+
+    if use_file:
+        try:
+            prompt_file = write_content_addressed(ARTIFACTS_DIR, system_prompt, ".md")
+            print(f"System prompt: {prompt_file} ({size} bytes)", file=sys.stderr)
+            return ["--system-prompt-file", str(prompt_file)]
+        except OSError as e:
+            print(f"  ⚠ Could not write system prompt file, passing inline: {e}", file=sys.stderr)
+
+    if size >= MAX_ARG_STRLEN and sys.platform.startswith("linux"):
+        print(f"\n✗ ERROR: System prompt is {size} bytes; Linux limits a single argument to {MAX_ARG_STRLEN} bytes.",
+              file=sys.stderr)
+        print("  Reduce the skills the persona imports, or pass it with --prompt-file (outside a sandbox).",
+              file=sys.stderr)
+        sys.exit(1)
+    return ["--system-prompt", system_prompt]
 
-    header += f"""# System Instructions
 
-## Precedence
+def agents_flags(team_agents: Dict) -> List[str]:
+    """
+    Build the --agents flag.
 
-This persona system prompt takes precedence over the default Claude Code system prompt. When there is a conflict, follow this system prompt's guidance.
+    Claude Code only accepts agents as inline JSON, so it is serialized
+    compactly and checked against the per-argument limit up front instead
+    of failing inside exec with E2BIG.
+    """
+    agents_json = json.dumps(team_agents, separators=(",", ":"))
+    size = len(agents_json.encode("utf-8"))
+    if size >= MAX_ARG_STRLEN and sys.platform.startswith("linux"):
+        print(f"\n✗ ERROR: Agents JSON is {size} bytes; Linux limits a single argument to {MAX_ARG_STRLEN} bytes.",
+              file=sys.stderr)
+        print("  Reduce the skills imported by team members.", file=sys.stderr)
+        sys.exit(1)
+    return ["--agents", agents_json]
 
----
 
-"""
+def session_id_flags(passthrough_flags: List[str], persona_name: str, model: str) -> List[str]:
+    """
+    Choose the Claude Code session id up front and log it with the persona.
+
+    Claude Code names the transcript after the session id, so the launch
+    log ties every transcript to the persona it ran with. Resumed
+    sessions keep their own id and aren't logged.
+    """
+    if RESUME_FLAGS & set(passthrough_flags):
+        return []
+    session_id = str(uuid.uuid4())
+    line = json.dumps({
+        "session_id": session_id,
+        "persona": persona_name,
+        "model": model,
+        "cwd": os.getcwd(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LAUNCH_LOG, "a") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"  ⚠ Could not append to {LAUNCH_LOG}: {e}", file=sys.stderr)
+    return ["--session-id", session_id]
 
-    body = "".join(result)
-    enforcement = build_enforcement_index(embedded_metadata)
-    return header + body + enforcement
 
+def write_debug_artifacts(system_prompt: str, team_agents: Optional[Dict]) -> None:
+    """
+    Save the prompt (and agents JSON) under DEBUG_DIR for inspection.
 
+    Files are named by content hash, so concurrent launches never clobber
+    each other and an unchanged prompt isn't rewritten. With the default
+    DEBUG_DIR this is the same file --system-prompt-file uses.
+    """
+    lines = system_prompt.count('\n')
+    bytes_count = len(system_prompt.encode('utf-8'))
+    try:
+        prompt_file = write_content_addressed(DEBUG_DIR, system_prompt, ".md")
+        print(f"\nDebug: System prompt saved to {prompt_file}", file=sys.stderr)
+        print(f"       ({lines} lines, {bytes_count} bytes, ~{estimate_tokens(bytes_count)} tokens)", file=sys.stderr)
+
+        if team_agents:
+            agents_json = json.dumps(team_agents, separators=(",", ":"))
+            agents_file = write_content_addressed(DEBUG_DIR, agents_json, ".json")
+            print(f"Debug: Agents JSON saved to {agents_file}", file=sys.stderr)
+            print(f"       ({len(team_agents)} agents, {len(agents_json.encode('utf-8'))} bytes)", file=sys.stderr)
+    except OSError as e:
+        print(f"  ⚠ Could not write debug artifacts: {e}", file=sys.stderr)
 
 # ============================================================================
-# Claude Code Binary
+# Binary Resolution
 # ============================================================================
 
+def binary_entry_valid(entry) -> bool:
+    """Whether a BINARIES_CACHE entry has the fields resolve_binary reads, with the right types."""
+    return (isinstance(entry, dict) and isinstance(entry.get("path"), str)
+            and isinstance(entry.get("search_path"), str) and isinstance(entry.get("mtime_ns"), int))
+
+
+def resolve_binary(name: str) -> Optional[str]:
+    """
+    Find an executable on PATH without spawning `which`.
+
+    Results are memoized in BINARIES_CACHE and reused while PATH is the same
+    and the binary's mtime hasn't changed; otherwise PATH is searched
+    in-process with shutil.which. A memo of the wrong shape is discarded
+    and rewritten.
+    """
+    search_path = os.environ.get("PATH", "")
+    try:
+        with open(BINARIES_CACHE) as f:
+            resolved = json.load(f)
+    except (OSError, ValueError):
+        resolved = {}
+    malformed = not (isinstance(resolved, dict) and all(binary_entry_valid(e) for e in resolved.values()))
+    if malformed:
+        resolved = {}
+
+    cached = resolved.get(name)
+    if cached and cached["search_path"] == search_path:
+        try:
+            if os.stat(cached["path"]).st_mtime_ns == cached["mtime_ns"]:
+                return cached["path"]
+        except OSError:
+            pass
+
+    found = shutil.which(name)
+    if found:
+        resolved[name] = {
+            "path": found,
+            "search_path": search_path,
+            "mtime_ns": os.stat(found).st_mtime_ns,
+        }
+    else:
+        resolved.pop(name, None)
+
+    if malformed or resolved.get(name) != cached:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_atomic(BINARIES_CACHE, json.dumps(resolved))
+        except OSError:
+            pass
+    return found
+
+
 def find_claude_cmd() -> str:
     """
     Locate Claude Code binary.
 
     Checks in order:
     1. $CLAUDE_CMD environment variable
-    2. which claude (npm/nvm installations)
+    2. claude on PATH (npm/nvm installations)
     3. ~/.claude/local/claude (local installation)
     """
     claude_cmd = os.environ.get("CLAUDE_CMD")
     if claude_cmd:
         return claude_cmd
 
-    # Try which claude
-    try:
-        result = subprocess.run(["which", "claude"], capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except:
-        pass
+    # Try claude on PATH
+    claude_on_path = resolve_binary("claude")
+    if claude_on_path:
+        return claude_on_path
 
     # Try local installation
     local_claude = Path.home() / ".claude" / "local" / "claude"
@@ -643,94 +903,647 @@ def find_claude_cmd() -> str:
     sys.exit(1)
 
 # ============================================================================
-# Main
+# Sandboxes
 # ============================================================================
 
-def main():
-    """Main entry point."""
-    personas, names, team_yamls = load_prompts()
+def sandbox_template_digest() -> Optional[str]:
+    """Image ID of the local sandbox template, or None if it isn't pulled (or docker failed or is missing)."""
+    try:
+        result = subprocess.run(["docker", "image", "inspect", "--format", "{{.Id}}", SANDBOX_TEMPLATE],
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    digest = result.stdout.strip()
+    return digest if result.returncode == 0 and digest else None
+
+
+def sandbox_command(sandbox_repo: str, claude_flags: List[str], fresh: bool) -> List[str]:
+    """
+    Build the `docker sandbox run` command, reusing a warm sandbox when possible.
+
+    The sandbox for a repo is kept between launches and recorded in
+    SANDBOX_STATE with the template image it was created from. It is
+    removed and recreated only when that image changed or on --fresh,
+    which also pulls the template first. If the template can't be
+    resolved, falls back to removing the sandbox and letting
+    `--pull-template always` create it.
+    """
+    sandbox_name = "claude-" + os.path.basename(sandbox_repo)
+    template_flags = ["--template", SANDBOX_TEMPLATE] if "CLAUDE_LAUNCHER_SANDBOX_TEMPLATE" in os.environ else []
+    run = ["docker", "sandbox", "run"] + template_flags
+    tail = ["claude", sandbox_repo, "--"] + claude_flags
+
+    state = read_json(SANDBOX_STATE) or {}
+    with span("sandbox template digest"):
+        digest = None if fresh else sandbox_template_digest()
+        record = state.get(sandbox_name)
+        if record and digest and record["repo"] == sandbox_repo and record["digest"] == digest:
+            print(f"Sandbox: reusing {sandbox_name}", file=sys.stderr)
+            return run + tail
+
+        if digest is None:
+            with span("docker pull"):
+                try:
+                    pulled = subprocess.run(["docker", "pull", "--quiet", SANDBOX_TEMPLATE],
+                                            capture_output=True).returncode == 0
+                except OSError:
+                    pulled = False
+            if pulled:
+                digest = sandbox_template_digest()
+
+    if fresh:
+        reason = "--fresh"
+    elif not digest:
+        reason = f"can't resolve {SANDBOX_TEMPLATE}"
+    else:
+        reason = "template changed" if record else "first launch"
+    print(f"Sandbox: recreating {sandbox_name} ({reason})", file=sys.stderr)
+    with span("docker sandbox rm"):
+        try:
+            subprocess.run(["docker", "sandbox", "rm", sandbox_name], capture_output=True)
+        except OSError:
+            pass
+
+    if digest:
+        state[sandbox_name] = {"repo": sandbox_repo, "digest": digest, "created": int(time.time())}
+        cmd = run + tail
+    else:
+        state.pop(sandbox_name, None)
+        cmd = run + ["--pull-template", "always"] + tail
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_atomic(SANDBOX_STATE, json.dumps(state, indent=2))
+    return cmd
+
+# ============================================================================
+# Launch Plans and Bundles
+# ============================================================================
+#
+# A launch plan is everything needed to start Claude Code for one selection:
+# {kind, name, source, model, prompt, agents, sections, dependencies}.
+# `cl build` stores one plan per shortcut as a bundle; a later launch whose
+# bundle is fresh execs from it without reading any markdown.
+
+def launch_target(options: Dict) -> Dict:
+    """The prompt target selected by --stable-layout / --compact."""
+    target = CLAUDE_CODE_TARGET
+    if options["stable_layout"]:
+        target = stable_target(target)
+    if options["compact"]:
+        target = compact_target(target)
+    return target
+
+
+def compile_selection(selected_file: Path, catalog: List[Dict], cache_mode: str, target: Dict,
+                      log: Callable[[str], None] = log_stderr) -> Dict:
+    """Compile a selected persona file or team.yaml into a launch plan, reporting progress to log."""
+    prompt_dirs = [d for d in [SYSTEM_PROMPTS_DIR, GLOBAL_PROMPTS_DIR] if d.exists()]
+
+    if selected_file.name == "team.yaml":
+        # Declarative team: resolve from team.yaml
+        skill_memo = {}
+        with span("compile team members"):
+            lead_file, persona_name, team_agents, lead_model, member_imports, dependencies = load_team_from_yaml(
+                selected_file, prompt_dirs, cache_mode, skill_memo, target, log)
+
+        # Process lead's system prompt
+        log("Processing lead system prompt...")
+        with span("compile lead"):
+            lead = compile_prompt(lead_file, cache_mode, skill_memo, target, log=log)
+        if lead["compaction"]:
+            report_compaction(lead["compaction"], log=log)
+        if lead["layout"]:
+            report_layout(lead["layout"], log=log)
+        report_shared_skills({lead_file.stem: lead["imports"], **member_imports}, log)
+        return {
+            "kind": "team",
+            "name": persona_name,
+            "source": str(selected_file),
+            "model": lead_model,
+            "prompt": lead["prompt"],
+            "agents": team_agents,
+            "sections": lead["sections"],
+            "dependencies": dependencies + lead["dependencies"],
+        }
+
+    # Solo persona
+    entry = catalog_by_path(catalog).get(str(selected_file))
+    persona_name = (entry and entry["name"]) or selected_file.stem
+
+    log("Processing system prompt...")
+    with span("compile"):
+        compiled = compile_prompt(selected_file, cache_mode, target=target, log=log)
+    if compiled["compaction"]:
+        report_compaction(compiled["compaction"], log=log)
+    if compiled["layout"]:
+        report_layout(compiled["layout"], log=log)
+    return {
+        "kind": "solo",
+        "name": persona_name,
+        "source": str(selected_file),
+        "model": None,
+        "prompt": compiled["prompt"],
+        "agents": None,
+        "sections": compiled["sections"],
+        "dependencies": compiled["dependencies"],
+    }
+
+
+def read_json(path: Path) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            data = f.read()
+    except OSError:
+        return None
+    count_read(len(data))
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def prompt_dir_mtimes() -> Dict[str, int]:
+    """mtime of each discovery directory (-1 if missing), to notice added or removed personas."""
+    mtimes = {}
+    for directory in [SYSTEM_PROMPTS_DIR, GLOBAL_PROMPTS_DIR, TEAMS_DIR, GLOBAL_TEAMS_DIR]:
+        try:
+            mtimes[str(directory)] = directory.stat().st_mtime_ns
+        except OSError:
+            mtimes[str(directory)] = -1
+    return mtimes
+
+
+def team_member_candidates(source: Path) -> Optional[List[str]]:
+    """
+    The .md files in a team's directory, which shadow system prompts of the
+    same name when members are resolved; None for a solo persona.
+    """
+    if source.name != "team.yaml":
+        return None
+    try:
+        return sorted(str(path) for path in source.parent.glob("*.md"))
+    except OSError:
+        return []
+
+
+def bundle_fresh(bundle: Dict) -> bool:
+    """Whether a bundle's dependencies and team member candidates are unchanged."""
+    return (bundle.get("version") == BUNDLE_VERSION
+            and bundle.get("member_candidates") == team_member_candidates(Path(bundle["source"]))
+            and dependencies_fresh(bundle["dependencies"]))
+
+
+def load_bundle_plan(args: List[str], target: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Resolve shortcut args against the bundle index and return (plan, model_key).
+
+    Returns (None, None) whenever the bundle can't be trusted: no index, a
+    different target, discovery directories changed since the build, an
+    arg the index doesn't know, a dependency of the bundle changed, or a
+    member file was added to or removed from a team's directory.
+    The caller then compiles from sources as usual.
+    """
+    index = read_json(BUNDLE_INDEX)
+    if not index or index.get("version") != BUNDLE_VERSION or index.get("target") != target["name"]:
+        return None, None
+    if index["dirs"] != prompt_dir_mtimes():
+        return None, None
+
+    bundles = index["bundles"]
+    if not all(arg in bundles or arg in MODELS for arg in args):
+        return None, None
+
+    personas = {shortcut: Path(bundle["source"]) for shortcut, bundle in bundles.items()}
+    selected_file, model_key = resolve_args(args, personas)
+    shortcut = next(s for s, path in personas.items() if path == selected_file)
+
+    plan = read_json(BUNDLES_DIR / bundles[shortcut]["file"])
+    if not plan or not bundle_fresh(plan):
+        print(f"Bundle for '{shortcut}' is stale, compiling from sources (run `cl build` to refresh)",
+              file=sys.stderr)
+        return None, None
+    return plan, model_key
+
+
+def build_bundles(args: List[str], options: Dict) -> int:
+    """
+    `cl build [--check] [--force]`: compile every persona and team into a bundle.
+
+    Bundles whose dependencies are unchanged are kept (--force rebuilds all).
+    With --check nothing is written; every selection is compiled and its
+    Claude Code flags validated, so CI can catch missing imports or an
+    oversized agents JSON. Returns the exit status: 1 if any failed.
+    """
+    unknown = [arg for arg in args if arg not in ("--check", "--force")]
+    if unknown:
+        print(f"Unknown build argument: {' '.join(unknown)}", file=sys.stderr)
+        print("Usage: cl build [--check] [--force]", file=sys.stderr)
+        return 1
+    check = "--check" in args
+    force = "--force" in args
+
+    target = launch_target(options)
+    cache_mode = CACHE_REBUILD if force else options["cache_mode"]
+    catalog = load_catalog(cache_mode)
+    personas, _, _ = load_prompts(catalog)
+    dir_mtimes = prompt_dir_mtimes()
+
+    index = {}
+    built = up_to_date = 0
+    failures = []
+    for shortcut, source in sorted(personas.items()):
+        bundle_file = f"{shortcut}.json"
+        existing = None if check or force else read_json(BUNDLES_DIR / bundle_file)
+        if (existing and existing["target"] == target["name"] and existing["source"] == str(source)
+                and bundle_fresh(existing)):
+            index[shortcut] = {"file": bundle_file, "source": existing["source"], "name": existing["name"]}
+            up_to_date += 1
+            continue
+
+        output = io.StringIO()
+        try:
+            with redirect_stderr(output), redirect_stdout(output):
+                plan = compile_selection(source, catalog, cache_mode, target)
+                if plan["agents"]:
+                    agents_flags(plan["agents"])
+        except SystemExit:
+            errors = [line.strip() for line in output.getvalue().splitlines() if "ERROR" in line or line.startswith("  - ")]
+            failures.append((shortcut, errors))
+            continue
+
+        built += 1
+        if check:
+            continue
+        bundle = {
+            "version": BUNDLE_VERSION,
+            "target": target["name"],
+            "shortcut": shortcut,
+            **plan,
+            "dependencies": fingerprint_dependencies(plan["dependencies"] + [LAUNCHER_FILE]),
+            "member_candidates": team_member_candidates(source),
+        }
+        BUNDLES_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomic(BUNDLES_DIR / bundle_file, json.dumps(bundle))
+        index[shortcut] = {"file": bundle_file, "source": plan["source"], "name": plan["name"]}
+
+    if not check:
+        BUNDLES_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomic(BUNDLE_INDEX, json.dumps({
+            "version": BUNDLE_VERSION,
+            "target": target["name"],
+            "dirs": dir_mtimes,
+            "bundles": index,
+        }))
+        # Remove bundles for shortcuts that no longer exist
+        keep = {entry["file"] for entry in index.values()} | {BUNDLE_INDEX.name}
+        for stale in BUNDLES_DIR.glob("*.json"):
+            if stale.name not in keep:
+                stale.unlink()
+
+    for shortcut, errors in failures:
+        print(f"✗ {shortcut}", file=sys.stderr)
+        for error in errors:
+            print(f"    {error}", file=sys.stderr)
+
+    verb = "compiled" if check else "built"
+    print(f"{'✗' if failures else '✓'} {len(personas)} selections: {built} {verb}, {up_to_date} up to date, "
+          f"{len(failures)} failed" + ("" if check else f" ({BUNDLES_DIR})"))
+    return 1 if failures else 0
 
-    if not personas:
-        print("Error: No system prompts found", file=sys.stderr)
+# ============================================================================
+# Fanout
+# ============================================================================
+#
+# `cl --fanout tdd,arc,doc --worktree -- "task"` runs one Claude Code session
+# per persona against the same repo. Plans come from fresh bundles or are
+# compiled up front, concurrently; the sessions then run side by side,
+# headless, each in its own worktree with its output in a log file.
+
+def plan_fanout(shortcuts: List[str], launcher_args: List[str], options: Dict,
+                target: Dict) -> List[Dict]:
+    """
+    Resolve and compile each fanout shortcut into a session dict (plan, model_key, compile_ms).
+
+    Personas compile concurrently before any session starts. Each worker
+    collects its progress in its own log, printed in shortcut order once all
+    are done, and catches its own compile error (compile_imports exits on a
+    missing import or a cycle) so the failure is reported for that persona.
+    """
+    cache_mode = options["cache_mode"]
+    sessions = {}
+    if cache_mode == CACHE_USE:
+        with span("bundle"):
+            for shortcut in shortcuts:
+                start = time.perf_counter()
+                plan, model_key = load_bundle_plan([shortcut] + launcher_args, target)
+                if plan:
+                    sessions[shortcut] = {"plan": plan, "model_key": model_key, "source": "bundle",
+                                          "compile_ms": (time.perf_counter() - start) * 1000}
+
+    to_compile = [shortcut for shortcut in shortcuts if shortcut not in sessions]
+    if to_compile:
+        with span("discovery"):
+            catalog = load_catalog(cache_mode)
+            personas, _, _ = load_prompts(catalog)
+        selections = {shortcut: resolve_args([shortcut] + launcher_args, personas) for shortcut in to_compile}
+
+        def compile_one(shortcut: str) -> Dict:
+            selected_file, model_key = selections[shortcut]
+            log = [f"\n[{shortcut}] Compiling {selected_file}"]
+            start = time.perf_counter()
+            try:
+                plan = compile_selection(selected_file, catalog, cache_mode, target, log.append)
+            except (SystemExit, Exception) as e:
+                detail = "" if isinstance(e, SystemExit) else f": {e}"
+                log.append(f"  ✗ Failed to compile {selected_file}{detail}")
+                return {"log": log, "plan": None}
+            return {"log": log, "plan": plan, "model_key": model_key, "source": "compiled",
+                    "compile_ms": (time.perf_counter() - start) * 1000}
+
+        with span("compile (concurrent)"):
+            with ThreadPoolExecutor(max_workers=len(to_compile)) as pool:
+                outcomes = dict(zip(to_compile, pool.map(compile_one, to_compile)))
+
+        failed = []
+        for shortcut in to_compile:
+            outcome = outcomes[shortcut]
+            print("\n".join(outcome.pop("log")), file=sys.stderr)
+            if outcome["plan"] is None:
+                failed.append(shortcut)
+            else:
+                sessions[shortcut] = outcome
+        if failed:
+            print(f"\n✗ Fanout: {', '.join(failed)} failed to compile; no sessions were started", file=sys.stderr)
+            sys.exit(1)
+
+    result = []
+    for shortcut in shortcuts:
+        session = sessions[shortcut]
+        plan = session["plan"]
+        if plan["model"] and plan["model"] in MODELS:
+            session["model_key"] = plan["model"]
+        result.append({"shortcut": shortcut, **session})
+    return result
+
+
+def worktree_name_index(flags: List[str]) -> Optional[int]:
+    """Index of the name following --worktree, if one was given."""
+    if "--worktree" not in flags:
+        return None
+    i = flags.index("--worktree") + 1
+    return i if i < len(flags) and not flags[i].startswith("-") else None
+
+
+def session_passthrough(passthrough: List[str], shortcut: str) -> List[str]:
+    """Give each session its own worktree: a named --worktree gets a -<shortcut> suffix."""
+    flags = list(passthrough)
+    name_index = worktree_name_index(flags)
+    if name_index is not None:
+        flags[name_index] = f"{flags[name_index]}-{shortcut}"
+    return flags
+
+
+def supervise_sessions(sessions: List[Dict]) -> None:
+    """
+    Run every session's command at once and wait for all of them.
+
+    Each child gets its own log file and no stdin. Records exit_code,
+    started_s (offset from the first start) and run_s on each session.
+    Ctrl-C, or a session that fails to start, terminates the children that
+    are still running; a start failure is reported by shortcut and exits.
+    """
+    procs = []
+    stopping = threading.Event()
+    first_start = time.perf_counter()
+
+    def run(session: Dict) -> None:
+        env = {**os.environ, "CLAUDE_PERSONA": session["plan"]["name"]}
+        start = time.perf_counter()
+        try:
+            with open(session["log"], "w") as log:
+                proc = subprocess.Popen(session["cmd"], stdin=subprocess.DEVNULL, stdout=log,
+                                        stderr=subprocess.STDOUT, env=env)
+                procs.append(proc)
+                # A stop that ran before this append missed the child
+                if stopping.is_set():
+                    proc.terminate()
+                session["exit_code"] = proc.wait()
+        except OSError as e:
+            session["start_error"] = e
+            raise
+        session["started_s"] = start - first_start
+        session["run_s"] = time.perf_counter() - start
+
+    def stop() -> None:
+        stopping.set()
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+        pool.shutdown(wait=True)
+
+    pool = ThreadPoolExecutor(max_workers=len(sessions))
+    futures = [pool.submit(run, session) for session in sessions]
+    try:
+        # Wake on the first start failure rather than after earlier sessions finish
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
+    except KeyboardInterrupt:
+        print("\nInterrupted, stopping sessions...", file=sys.stderr)
+        stop()
+        raise
+    except OSError:
+        stop()
+        for session in sessions:
+            if "start_error" in session:
+                print(f"\n✗ Fanout: could not start {session['shortcut']}: {session['start_error']}",
+                      file=sys.stderr)
+        if procs:
+            print("  Stopped the sessions already running; their logs are kept", file=sys.stderr)
         sys.exit(1)
+    pool.shutdown(wait=True)
+
+
+def run_fanout(launcher_args: List[str], passthrough_flags: List[str], sandbox_repo: Optional[str],
+               options: Dict) -> int:
+    """
+    Run one headless Claude Code session per --fanout persona in parallel.
+
+    Any remaining launcher args (e.g. a model shortcut) apply to every
+    session. Passthrough flags, including the task after --, go to each
+    session; --print is added unless already given, because sessions
+    share one terminal. Returns 1 if any session exited non-zero.
+    """
+    shortcuts = list(dict.fromkeys(options["fanout"]))
+    if sandbox_repo:
+        print("✗ --fanout can't be combined with --sandbox", file=sys.stderr)
+        return 1
+    name_index = worktree_name_index(passthrough_flags)
+    task_flags = [flag for i, flag in enumerate(passthrough_flags) if flag != "--worktree" and i != name_index]
+    if not options["report"] and not task_flags:
+        print("✗ Fanout sessions run headless: give them a task after --, e.g.", file=sys.stderr)
+        print('  cl --fanout tdd,arc --worktree -- "Review the auth module"', file=sys.stderr)
+        return 1
+
+    target = launch_target(options)
+    sessions = plan_fanout(shortcuts, launcher_args, options, target)
+
+    within = check_token_budget(
+        {s["plan"]["name"]: s["plan"]["prompt"] for s in sessions}, options)
+    if options["report"]:
+        for session in sessions:
+            print_size_report(f"Size report: {session['plan']['name']}", session["plan"]["sections"])
+        return 1 if not within and options["budget_fail"] else 0
+
+    run_id = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    run_dir = FANOUT_DIR / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    with span("claude flags"):
+        claude_cmd = find_claude_cmd()
+        for session in sessions:
+            plan = session["plan"]
+            flags = session_passthrough(passthrough_flags, session["shortcut"])
+            if not {"-p", "--print"} & set(flags):
+                flags = ["--print"] + flags
+            session["cmd"] = ([claude_cmd]
+                              + system_prompt_flags(plan["prompt"], options["prompt_transport"], print_mode=True)
+                              + ["--model", MODELS[session["model_key"]]]
+                              + (agents_flags(plan["agents"]) if plan["agents"] else [])
+                              + session_id_flags(flags, plan["name"], MODELS[session["model_key"]])
+                              + flags)
+            session["log"] = run_dir / f"{session['shortcut']}.log"
+
+    print(f"\nFanout: {len(sessions)} sessions, logs in {run_dir}", file=sys.stderr)
+    for session in sessions:
+        print(f"  {session['shortcut']:<8} {session['plan']['name']} ({session['model_key']}, "
+              f"{session['source']} in {session['compile_ms']:.0f} ms)", file=sys.stderr)
+
+    with span("sessions"):
+        supervise_sessions(sessions)
+
+    print(f"\n{'session':<10} {'exit':>5} {'run s':>8}  log", file=sys.stderr)
+    for session in sessions:
+        mark = "✓" if session["exit_code"] == 0 else "✗"
+        print(f"{mark} {session['shortcut']:<8} {session['exit_code']:>5} {session['run_s']:>8.1f}  {session['log']}",
+              file=sys.stderr)
+
+    summary = [
+        {
+            "shortcut": session["shortcut"],
+            "persona": session["plan"]["name"],
+            "model": MODELS[session["model_key"]],
+            "source": session["source"],
+            "compile_ms": round(session["compile_ms"], 3),
+            "started_s": round(session["started_s"], 3),
+            "run_s": round(session["run_s"], 3),
+            "exit_code": session["exit_code"],
+            "log": str(session["log"]),
+        }
+        for session in sessions
+    ]
+    write_atomic(run_dir / "summary.json", json.dumps(summary, indent=2))
+    timings.report({"mode": "fanout", "sessions": summary}, options["timings_jsonl"])
+    return 1 if any(session["exit_code"] != 0 for session in sessions) else 0
+
+# ============================================================================
+# Main
+# ============================================================================
 
-    # Extract passthrough flags before parsing launcher args
+def main():
+    """Main entry point."""
+    # Extract launcher and passthrough flags before parsing launcher args
     raw_args = sys.argv[1:]
+    raw_args, options = extract_launcher_flags(raw_args)
     launcher_args, passthrough_flags, sandbox_repo = extract_passthrough_flags(raw_args)
+    cache_mode = options["cache_mode"]
+    if options["timings"]:
+        timings.enable()
 
-    # Show header for interactive mode (no persona/model args)
-    if not launcher_args:
-        print()
-        print("     ╭─────────────────────────╮")
-        print("     │   🚀  CLAUDE LAUNCHER   │")
-        print("     ╰─────────────────────────╯")
-        print()
-        print("  Select persona & model to launch")
-        print()
-
-    # Parse arguments
-    if launcher_args:
-        # Shortcut mode
-        selected_file, model_key = resolve_args(launcher_args, personas)
-    else:
-        # Interactive mode
-        selected_file, model_key = interactive_select(personas)
+    if launcher_args[:1] == ["build"]:
+        sys.exit(build_bundles(launcher_args[1:], options))
 
-    # Determine if this is a team.yaml selection
-    prompt_dirs = [d for d in [SYSTEM_PROMPTS_DIR, GLOBAL_PROMPTS_DIR] if d.exists()]
-    is_team_yaml = selected_file.name == "team.yaml"
+    if options["fanout"]:
+        sys.exit(run_fanout(launcher_args, passthrough_flags, sandbox_repo, options))
 
-    if is_team_yaml:
-        # Declarative team: resolve from team.yaml
-        lead_file, persona_name, team_agents, lead_model = load_team_from_yaml(selected_file, prompt_dirs)
+    target = launch_target(options)
 
-        # Lead model: team.yaml > CLI arg
-        if lead_model and lead_model in MODELS:
-            model_key = lead_model
+    # Shortcut launches use a fresh bundle from `cl build` when there is one
+    plan = None
+    if launcher_args and cache_mode == CACHE_USE:
+        with span("bundle"):
+            plan, model_key = load_bundle_plan(launcher_args, target)
+        if plan:
+            print(f"Bundle: {plan['shortcut']} (built by `cl build`)", file=sys.stderr)
 
-        print(f"\nSelected: {persona_name} (team)")
-        model_display = next((k for k, v in MODELS.items() if v == MODELS[model_key]), model_key)
-        print(f"Model: {model_display}")
-        print()
+    if plan is None:
+        with span("discovery"):
+            catalog = load_catalog(cache_mode)
+            personas, names, team_yamls = load_prompts(catalog)
 
-        # Process lead's system prompt
-        print("Processing lead system prompt...", file=sys.stderr)
-        system_prompt = process_imports(lead_file, persona_name)
+        if not personas:
+            print("Error: No system prompts found", file=sys.stderr)
+            sys.exit(1)
 
-    else:
-        # Solo persona
-        metadata = parse_frontmatter(selected_file)
-        persona_name = metadata.get("name", selected_file.stem)
+        # Show header for interactive mode (no persona/model args)
+        if not launcher_args:
+            print()
+            print("     ╭─────────────────────────╮")
+            print("     │   🚀  CLAUDE LAUNCHER   │")
+            print("     ╰─────────────────────────╯")
+            print()
+            print("  Select persona & model to launch")
+            print()
+
+        # Parse arguments
+        with span("selection"):
+            if launcher_args:
+                # Shortcut mode
+                selected_file, model_key = resolve_args(launcher_args, personas)
+            else:
+                # Interactive mode
+                selected_file, model_key = interactive_select(personas, catalog, options["single_picker"])
 
-        print(f"\nSelected: {persona_name}")
-        model_display = next((k for k, v in MODELS.items() if v == MODELS[model_key]), model_key)
-        print(f"Model: {model_display}")
-        print()
+        plan = compile_selection(selected_file, catalog, cache_mode, target)
 
-        # Process imports
-        print("Processing system prompt...", file=sys.stderr)
-        system_prompt = process_imports(selected_file, persona_name)
-        team_agents = None
+    persona_name = plan["name"]
+    system_prompt = plan["prompt"]
+    sections = plan["sections"]
+    team_agents = plan["agents"]
+
+    # Lead model: team.yaml > CLI arg
+    if plan["model"] and plan["model"] in MODELS:
+        model_key = plan["model"]
+
+    print(f"\nSelected: {persona_name}" + (" (team)" if plan["kind"] == "team" else ""))
+    model_display = next((k for k, v in MODELS.items() if v == MODELS[model_key]), model_key)
+    print(f"Model: {model_display}")
+    print()
+
+    budget_prompts = {persona_name: system_prompt}
+    budget_prompts.update({name: agent["prompt"] for name, agent in (team_agents or {}).items()})
+
+    if options["report"]:
+        print_size_report(f"Size report: {persona_name}" + (" (lead)" if team_agents else ""), sections)
+        if team_agents:
+            print_size_report("Team agents", [
+                {"name": name, "kind": "agent", "bytes": len(agent["prompt"].encode("utf-8"))}
+                for name, agent in team_agents.items()
+            ])
+        within = check_token_budget(budget_prompts, options)
+        if options["token_budget"] is not None and within:
+            print(f"\n✓ Within the {options['token_budget']}-token budget")
+        sys.exit(1 if not within and options["budget_fail"] else 0)
+
+    check_token_budget(budget_prompts, options)
 
     if team_agents:
         print(f"Mode: Team ({len(team_agents)} agents)", file=sys.stderr)
     else:
         print("Mode: Solo", file=sys.stderr)
 
-    with open(DEBUG_OUTPUT, 'w') as f:
-        f.write(system_prompt)
-
-    lines = system_prompt.count('\n')
-    bytes_count = len(system_prompt.encode('utf-8'))
-    print(f"\nDebug: System prompt saved to {DEBUG_OUTPUT}", file=sys.stderr)
-    print(f"       ({lines} lines, {bytes_count} bytes)", file=sys.stderr)
-
-    if team_agents:
-        with open(DEBUG_AGENTS_OUTPUT, 'w') as f:
-            json.dump(team_agents, f, indent=2)
-        agents_bytes = DEBUG_AGENTS_OUTPUT.stat().st_size
-        print(f"Debug: Agents JSON saved to {DEBUG_AGENTS_OUTPUT}", file=sys.stderr)
-        print(f"       ({len(team_agents)} agents, {agents_bytes} bytes)", file=sys.stderr)
+    if not options["fast"]:
+        with span("debug artifacts"):
+            write_debug_artifacts(system_prompt, team_agents)
 
     # Export persona for statusline
     os.environ["CLAUDE_PERSONA"] = persona_name
@@ -742,11 +1555,17 @@ def main():
     print()
     print("Launching Claude Code...\n")
 
-    # Build claude flags (shared between direct and sandbox modes)
-    claude_flags = ["--system-prompt", system_prompt, "--model", MODELS[model_key]]
+    # Build claude flags (shared between direct and sandbox modes).
+    # Sandboxes can't see host files, so they always get the prompt inline.
+    transport = PROMPT_INLINE if sandbox_repo else options["prompt_transport"]
+    with span("claude flags"):
+        print_mode = bool({"-p", "--print"} & set(passthrough_flags))
+        claude_flags = system_prompt_flags(system_prompt, transport, print_mode) + ["--model", MODELS[model_key]]
 
-    if team_agents:
-        claude_flags.extend(["--agents", json.dumps(team_agents)])
+        if team_agents:
+            claude_flags.extend(agents_flags(team_agents))
+
+        claude_flags.extend(session_id_flags(passthrough_flags, persona_name, MODELS[model_key]))
 
     # Append passthrough flags (e.g., --worktree)
     if passthrough_flags:
@@ -758,16 +1577,19 @@ def main():
 
     # Execute
     if sandbox_repo:
-        # Sandbox mode: remove existing sandbox, then create fresh
-        sandbox_name = "claude-" + os.path.basename(sandbox_repo)
-        subprocess.run(["docker", "sandbox", "rm", sandbox_name],
-                       capture_output=True)
-        cmd = ["docker", "sandbox", "run", "--pull-template", "always", "claude", sandbox_repo, "--"] + claude_flags
+        # Sandbox mode: reuse the warm sandbox unless its template changed
+        cmd = sandbox_command(sandbox_repo, claude_flags, options["fresh_sandbox"])
     else:
         # Direct mode: claude <flags>
-        claude_cmd = find_claude_cmd()
+        with span("find_claude_cmd"):
+            claude_cmd = find_claude_cmd()
         cmd = [claude_cmd] + claude_flags
 
+    timings.report(
+        {"persona": persona_name, "model": MODELS[model_key], "mode": "team" if team_agents else "solo"},
+        options["timings_jsonl"],
+    )
+
     try:
         os.execvp(cmd[0], cmd)
     except Exception as e:
@@ -0,0 +1,929 @@
+"""
+Prompt Assembly - Shared persona compilation for the Claude and OpenCode launchers.
+
+Used by claude-launcher/claude-launcher.py and
+opencode-launcher/generate-opencode-agents.py so both tools discover,
+compile and cache personas the same way:
+
+- Frontmatter and team.yaml parsing
+- Prompt catalog: persisted index of every persona and team
+- Recursive @ import resolution with a per-run skill memo
+- Pluggable targets (precedence header + output wrapper per tool)
+- Compiled prompt cache keyed by target and import-graph fingerprints
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from timings import count_read, count_write
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+LAUNCHER_DIR = Path(__file__).resolve().parent.parent
+SYSTEM_PROMPTS_DIR = LAUNCHER_DIR / "system-prompts"
+TEAMS_DIR = SYSTEM_PROMPTS_DIR / "teams"
+GLOBAL_PROMPTS_DIR = Path.home() / ".claude" / "system-prompts"
+GLOBAL_TEAMS_DIR = GLOBAL_PROMPTS_DIR / "teams"
+LIBRARY_FILE = Path(__file__).resolve()
+
+# Compiled prompt cache (see "Compiled Prompt Cache" below)
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", str(Path.home() / ".cache"))) / "claude-launcher"
+PROMPT_CACHE_DIR = CACHE_DIR / "prompts"
+CACHE_VERSION = 6
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHE_MAX_ENTRIES = 256
+CACHE_USE = "use"
+CACHE_REBUILD = "rebuild"
+CACHE_OFF = "off"
+# Names write_content_addressed gives its files; only these are ever pruned
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{32}\.(md|json)$")
+
+
+def log_stderr(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def _tmp_path(path: Path) -> Path:
+    """Temp file next to path, unique per process and thread."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_atomic(path: Path, content: str) -> None:
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    count_write(len(content))
+
+# ============================================================================
+# Targets
+# ============================================================================
+#
+# A target describes how a compiled prompt is presented to one tool:
+# - precedence: the sentence placed under "## Precedence" in the header
+# - frontmatter: prefix written before the prompt when rendered to a file
+# - compact (optional): run the compaction pass over imported skills
+# - stable (optional): stable-prefix layout, see _assemble_stable
+
+CLAUDE_CODE_TARGET = {
+    "name": "claude-code",
+    "precedence": "This persona system prompt takes precedence over the default Claude Code system prompt. When there is a conflict, follow this system prompt's guidance.",
+    "frontmatter": lambda name: "",
+}
+
+OPENCODE_TARGET = {
+    "name": "opencode",
+    "precedence": "This persona system prompt takes precedence over the default system prompt. When there is a conflict, follow this system prompt's guidance.",
+    "frontmatter": lambda name: f"---\ndescription: {name}\nmode: primary\n---\n",
+}
+
+
+def compact_target(target: Dict) -> Dict:
+    """The same target with skill compaction enabled (cached separately)."""
+    return {**target, "name": f"{target['name']}+compact", "compact": True}
+
+
+def stable_target(target: Dict) -> Dict:
+    """The same target with the stable-prefix layout (cached separately)."""
+    return {**target, "name": f"{target['name']}+stable", "stable": True}
+
+
+def render_target(target: Dict, name: str, prompt: str) -> str:
+    """Render a compiled prompt as the target's file format."""
+    return target["frontmatter"](name) + prompt
+
+# ============================================================================
+# Data Parsing
+# ============================================================================
+
+def parse_frontmatter(file_path: Path) -> Dict[str, str]:
+    """
+    Parse YAML frontmatter from prompt file.
+
+    Extracts key-value pairs between --- delimiters at the start of a file.
+    Only the header is read, and only its bytes are counted.
+    """
+    metadata = {}
+    consumed = 0
+    try:
+        with open(file_path, "rb") as f:
+            first_line = f.readline()
+            consumed += len(first_line)
+            if first_line.strip() != b"---":
+                return metadata
+
+            for raw in f:
+                consumed += len(raw)
+                line = raw.decode("utf-8").strip()
+                if line == "---":
+                    break
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    metadata[key.strip()] = value.strip()
+    except Exception as e:
+        print(f"Error parsing {file_path}: {e}", file=sys.stderr)
+    finally:
+        count_read(consumed)
+
+    return metadata
+
+
+def build_enforcement_index(embedded_metadata: List[Dict[str, str]]) -> str:
+    if not embedded_metadata:
+        return ""
+
+    lines = [
+        "\n---\n",
+        "\n## Skill Activation Protocol\n",
+        f"You have {len(embedded_metadata)} embedded skills. They are ALL active for this session.",
+        "IF A SKILL APPLIES TO YOUR TASK, YOU DO NOT HAVE A CHOICE. YOU MUST USE IT. THIS IS NOT NEGOTIABLE.",
+        "If you catch yourself violating a skill, STOP IMMEDIATELY, re-read the skill, and correct course.",
+        "Before EVERY action, check: does this violate any embedded skill? If yes, DO NOT PROCEED.\n",
+        "### Embedded Skills\n",
+    ]
+    for meta in embedded_metadata:
+        lines.append(f"- **{meta['name']}**: {meta['description']}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_team_yaml(file_path: Path, header_only: bool = False) -> Dict:
+    """
+    Parse a team.yaml file into structured data.
+
+    Expected format:
+        name: Team Name
+        shortcut: xxx
+
+        team:
+          - name: member-one
+            model: opus
+          - name: member-two
+
+    With header_only, reading stops once the lead (first member) is
+    complete: enough for the catalog, which only needs name, shortcut,
+    description and the lead model. Members are resolved when the team
+    is actually launched.
+    """
+    result = {"members": []}
+    current_member = None
+    in_team = False
+
+    # Only the lines consumed are counted, so a header-only read reports the header's bytes
+    consumed = 0
+    with open(file_path) as f:
+        for line in f:
+            consumed += len(line.encode("utf-8"))
+            stripped = line.strip()
+            if not stripped:
+                continue
+
+            if stripped == "team:":
+                in_team = True
+                continue
+
+            if not in_team:
+                if ":" in stripped:
+                    key, value = stripped.split(":", 1)
+                    result[key.strip()] = value.strip()
+                continue
+
+            # Inside team list
+            if stripped.startswith("- name:"):
+                if current_member:
+                    result["members"].append(current_member)
+                    if header_only:
+                        count_read(consumed)
+                        return result
+                name = stripped.split(":", 1)[1].strip()
+                current_member = {"name": name}
+            elif stripped.startswith("model:") and current_member:
+                current_member["model"] = stripped.split(":", 1)[1].strip()
+
+        if current_member:
+            result["members"].append(current_member)
+
+    count_read(consumed)
+    return result
+
+# ============================================================================
+# Prompt Catalog
+# ============================================================================
+
+def _catalog_solo_entry(file_path: Path, stat: os.stat_result) -> Dict:
+    metadata = parse_frontmatter(file_path)
+    return {
+        "kind": "solo",
+        "path": str(file_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "shortcut": metadata.get("shortcut"),
+        "name": metadata.get("name"),
+        "description": metadata.get("description", "").strip('"').strip("'") or None,
+        "model": metadata.get("model"),
+    }
+
+
+def _catalog_team_entry(team_yaml: Path, stat: os.stat_result) -> Dict:
+    config = parse_team_yaml(team_yaml, header_only=True)
+    members = config.get("members") or []
+    return {
+        "kind": "team",
+        "path": str(team_yaml),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "shortcut": config.get("shortcut"),
+        "name": config.get("name"),
+        "description": config.get("description"),
+        "model": members[0].get("model") if members else None,
+    }
+
+
+def _list_solo_candidates(prompt_dir: Path) -> List[Path]:
+    return sorted(prompt_dir.glob("*.md"))
+
+
+def _list_team_candidates(teams_dir: Path) -> List[Path]:
+    # Every subdirectory is a candidate, even before it has a team.yaml,
+    # so a team.yaml added later is picked up by its per-file stat.
+    return [d / "team.yaml" for d in sorted(teams_dir.iterdir()) if d.is_dir()]
+
+
+def _refresh_catalog_dir(directory: Path, cached: Optional[Dict], list_candidates, make_entry) -> Dict:
+    """
+    Refresh the catalog records for one directory.
+
+    The directory listing is only re-read when the directory mtime changed
+    (files added, removed or renamed). Each candidate is then stat'ed and
+    only re-parsed when its mtime or size differs from the cached entry, so
+    in-place edits to frontmatter are still picked up.
+    """
+    dir_mtime = directory.stat().st_mtime_ns
+    previous = cached["entries"] if cached else {}
+
+    if cached and cached["mtime_ns"] == dir_mtime:
+        candidates = [Path(p) for p in cached["candidates"]]
+    else:
+        candidates = list_candidates(directory)
+
+    entries = {}
+    for path in candidates:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        old = previous.get(str(path))
+        if old and old["mtime_ns"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+            entries[str(path)] = old
+        else:
+            entries[str(path)] = make_entry(path, stat)
+
+    return {
+        "mtime_ns": dir_mtime,
+        "candidates": [str(p) for p in candidates],
+        "entries": entries,
+    }
+
+
+def load_catalog(cache_mode: str = CACHE_USE, log: Callable[[str], None] = log_stderr) -> List[Dict]:
+    """
+    Build the catalog of every solo persona and team, once per run.
+
+    Each entry carries kind (solo/team), path, shortcut, name, description,
+    model and mtime. The catalog is persisted in CACHE_DIR/catalog.json and
+    refreshed incrementally per directory (see _refresh_catalog_dir).
+
+    Entries are ordered solo personas (project, then global) followed by
+    teams (project, then global), so later entries win shortcut collisions.
+    """
+    index_path = CACHE_DIR / "catalog.json"
+    stored = {}
+    if cache_mode == CACHE_USE:
+        try:
+            with open(index_path) as f:
+                count_read(os.fstat(f.fileno()).st_size)
+                stored = json.load(f)
+            if stored.get("version") != CACHE_VERSION:
+                stored = {}
+        except (OSError, ValueError):
+            stored = {}
+
+    sources = [
+        (SYSTEM_PROMPTS_DIR, _list_solo_candidates, _catalog_solo_entry),
+        (GLOBAL_PROMPTS_DIR, _list_solo_candidates, _catalog_solo_entry),
+        (TEAMS_DIR, _list_team_candidates, _catalog_team_entry),
+        (GLOBAL_TEAMS_DIR, _list_team_candidates, _catalog_team_entry),
+    ]
+
+    stored_dirs = stored.get("dirs", {})
+    dirs = {}
+    catalog = []
+    for directory, list_candidates, make_entry in sources:
+        if not directory.exists():
+            continue
+        record = _refresh_catalog_dir(directory, stored_dirs.get(str(directory)), list_candidates, make_entry)
+        dirs[str(directory)] = record
+        catalog.extend(record["entries"].values())
+
+    if cache_mode != CACHE_OFF and dirs != stored_dirs:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_atomic(index_path, json.dumps({"version": CACHE_VERSION, "dirs": dirs}))
+        except OSError as e:
+            log(f"  ⚠ Could not write catalog index: {e}")
+
+    return catalog
+
+
+def catalog_by_path(catalog: List[Dict]) -> Dict[str, Dict]:
+    """Index catalog entries by file path."""
+    return {entry["path"]: entry for entry in catalog}
+
+# ============================================================================
+# Import Processing
+# ============================================================================
+
+IMPORT_PATTERN = re.compile(r'^\s*-?\s*@([^\s]+)\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+
+# Paragraphs shorter than this (separators, "**Example:**") are never deduplicated
+COMPACT_MIN_PARAGRAPH = 40
+
+
+def resolve_import_path(reference: str, base_dir: Path) -> Path:
+    """Resolve an @ reference relative to the file that contains it."""
+    import_path = reference.replace("~", str(Path.home()))
+    if not import_path.startswith("/"):
+        import_path = str(base_dir / import_path)
+    return Path(import_path)
+
+
+def load_skill(import_path: Path, skill_memo: Dict[str, Dict]) -> Dict:
+    """
+    Read and parse a skill file once per launch.
+
+    The memo is keyed by resolved path and shared by every prompt compiled
+    in the same run (team lead and members), so each distinct skill is read
+    once no matter how many members import it. Each entry holds the skill's
+    metadata and its content split into text segments and nested imports —
+    one node of the import DAG.
+
+    Nested @ references must point at a .md file, so code samples such as
+    Python decorators are never mistaken for imports.
+    """
+    key = str(import_path.resolve())
+    if key in skill_memo:
+        return skill_memo[key]
+
+    with open(import_path) as f:
+        count_read(os.fstat(f.fileno()).st_size)
+        lines = f.readlines()
+
+    metadata = {}
+    if lines and lines[0].strip() == "---":
+        for line in lines[1:]:
+            line = line.strip()
+            if line == "---":
+                break
+            if ":" in line:
+                k, value = line.split(":", 1)
+                metadata[k.strip()] = value.strip()
+
+    segments = []
+    text = []
+    for line in lines:
+        match = IMPORT_PATTERN.match(line)
+        if match and match.group(1).endswith(".md"):
+            if text:
+                segments.append("".join(text))
+                text = []
+            segments.append(resolve_import_path(match.group(1), import_path.parent))
+        else:
+            text.append(line)
+    if text:
+        segments.append("".join(text))
+
+    skill_dir = import_path.parent.name if import_path.name == "SKILL.md" else import_path.stem
+    skill_memo[key] = {
+        "key": key,
+        "path": import_path,
+        "skill_dir": skill_dir,
+        "metadata": metadata,
+        "segments": segments,
+    }
+    return skill_memo[key]
+
+
+def _expand_import(import_path: Path, skill_memo: Dict[str, Dict], state: Dict, stack: List[str]) -> None:
+    """Append a skill and, depth-first, its nested imports to the prompt state."""
+    if not import_path.exists():
+        state["log"](f"  ✗ ERROR: Import file not found: {import_path}")
+        state["errors"].append(str(import_path))
+        return
+
+    skill = load_skill(import_path, skill_memo)
+    key = skill["key"]
+
+    if key in stack:
+        cycle = " → ".join(Path(k).parent.name if Path(k).name == "SKILL.md" else Path(k).name for k in stack + [key])
+        state["log"](f"  ✗ ERROR: Import cycle: {cycle}")
+        state["errors"].append(f"import cycle: {cycle}")
+        return
+
+    skill_dir = skill["skill_dir"]
+    if key in state["seen"]:
+        state["log"](f"  ✓ Already loaded: {skill_dir}")
+        return
+    state["seen"].add(key)
+
+    indent = "  " * len(stack)
+    state["log"](f"{indent}✓ Found: {skill_dir}")
+    skill_meta = skill["metadata"]
+    skill_id = f"development-skills:{skill_dir}"
+    display_name = skill_meta.get("name", skill_dir)
+    state["imports"].append({"id": skill_id, "display_name": display_name, "path": key})
+    if "description" in skill_meta:
+        state["embedded_metadata"].append({
+            "name": skill_id,
+            "description": skill_meta["description"].strip('"').strip("'"),
+        })
+    state["dependencies"].append(skill["path"])
+
+    # The skill's own text; nested imports get sections of their own
+    section = {"name": skill_dir, "kind": "skill", "bytes": 2}
+    state["sections"].append(section)
+    # Stable layout: keep the text aside, it is placed (and compacted) in sorted order later
+    chunk = {"id": skill_id, "section": section, "segments": []}
+    state["skill_chunks"].append(chunk)
+
+    stack.append(key)
+    for index, segment in enumerate(skill["segments"]):
+        if isinstance(segment, Path):
+            _expand_import(segment, skill_memo, state, stack)
+        elif state["stable"]:
+            chunk["segments"].append((index, segment))
+        else:
+            if state["compaction"] is not None:
+                segment = _compact_text(segment, state, strip_frontmatter=index == 0)
+            state["result"].append(segment)
+            section["bytes"] += len(segment.encode("utf-8"))
+    stack.pop()
+    if not state["stable"]:
+        state["result"].append("\n\n")
+
+
+def _compact_text(text: str, state: Dict, strip_frontmatter: bool) -> str:
+    """
+    Compact one text segment of an imported skill.
+
+    - Drops the skill's frontmatter (its description is already in the
+      enforcement index)
+    - Drops paragraphs already emitted by an earlier skill, and a heading
+      whose whole section was dropped that way; fenced code blocks count as
+      one paragraph
+    - Strips trailing whitespace and collapses runs of blank lines
+
+    Bytes removed are added to state["compaction"] by category.
+    """
+    removed = {"frontmatter": 0, "duplicates": 0}
+    lines = text.splitlines()
+
+    if strip_frontmatter and lines and lines[0].strip() == "---":
+        for end in range(1, len(lines)):
+            if lines[end].strip() == "---":
+                removed["frontmatter"] = len("\n".join(lines[:end + 1]).encode("utf-8")) + 1
+                lines = lines[end + 1:]
+                break
+
+    blocks = []
+    current = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip()
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        if not line and not in_fence:
+            if current:
+                blocks.append(current)
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append(current)
+
+    kept = []
+    heading = None  # the open section: {"index", "had_content", "kept_content"}
+
+    def close_section():
+        if heading and heading["had_content"] and not heading["kept_content"]:
+            removed["duplicates"] += len(kept[heading["index"]][0].encode("utf-8"))
+            kept[heading["index"]] = None
+
+    for block in blocks:
+        if len(block) == 1 and HEADING_PATTERN.match(block[0]):
+            close_section()
+            kept.append(block)
+            heading = {"index": len(kept) - 1, "had_content": False, "kept_content": False}
+            continue
+
+        if heading:
+            heading["had_content"] = True
+        normalized = " ".join(" ".join(block).split())
+        if len(normalized) >= COMPACT_MIN_PARAGRAPH:
+            if normalized in state["paragraphs"]:
+                removed["duplicates"] += len("\n".join(block).encode("utf-8"))
+                continue
+            state["paragraphs"].add(normalized)
+        kept.append(block)
+        if heading:
+            heading["kept_content"] = True
+    close_section()
+
+    kept = [block for block in kept if block is not None]
+    compacted = "\n\n".join("\n".join(block) for block in kept) + "\n" if kept else ""
+
+    saved = state["compaction"]
+    saved["frontmatter"] += removed["frontmatter"]
+    saved["duplicates"] += removed["duplicates"]
+    saved["whitespace"] += (len(text.encode("utf-8")) - len(compacted.encode("utf-8"))
+                            - removed["frontmatter"] - removed["duplicates"])
+    return compacted
+
+
+def _skill_manifest(imports: List[Dict]) -> str:
+    manifest = "\n# Loaded Skills\n\n"
+    manifest += "The following skills have been loaded and are active for this session:\n\n"
+    for imp in imports:
+        manifest += f"- **{imp['display_name']}** ({imp['id']})\n"
+    return manifest + "\n---\n\n"
+
+
+def _precedence_block(target: Dict) -> str:
+    return f"""# System Instructions
+
+## Precedence
+
+{target["precedence"]}
+
+---
+
+"""
+
+
+def _assemble_stable(state: Dict, target: Dict, persona_section: Dict) -> Dict:
+    """
+    Lay a prompt out for upstream prompt-prefix caching.
+
+    The stable prefix holds the precedence block, then every skill sorted by
+    id, then the enforcement index, and nothing that depends on the persona
+    file itself. The skill manifest and the persona body come last. Any two
+    personas that import the same skills get a byte-identical prefix, and
+    editing a persona body never changes it.
+
+    Returns {prompt, sections, layout} where layout holds the prefix size and
+    its sha256 fingerprint.
+    """
+    prefix = "---\n" + _precedence_block(target)
+    sections = [{"name": "header", "kind": "header", "bytes": len(prefix.encode("utf-8"))}]
+
+    for chunk in sorted(state["skill_chunks"], key=lambda c: c["id"]):
+        text = ""
+        for index, segment in chunk["segments"]:
+            if state["compaction"] is not None:
+                segment = _compact_text(segment, state, strip_frontmatter=index == 0)
+            text += segment
+        text += "\n\n"
+        chunk["section"]["bytes"] = len(text.encode("utf-8"))
+        sections.append(chunk["section"])
+        prefix += text
+
+    enforcement = build_enforcement_index(sorted(state["embedded_metadata"], key=lambda m: m["name"]))
+    if enforcement:
+        sections.append({"name": "enforcement index", "kind": "index", "bytes": len(enforcement.encode("utf-8"))})
+        prefix += enforcement
+
+    volatile = ""
+    if state["imports"]:
+        volatile = "\n---\n" + _skill_manifest(sorted(state["imports"], key=lambda imp: imp["id"]))
+        sections.append({"name": "skill manifest", "kind": "header", "bytes": len(volatile.encode("utf-8"))})
+    body = "".join(state["result"])
+    sections.append(persona_section)
+
+    prefix_bytes = prefix.encode("utf-8")
+    return {
+        "prompt": prefix + volatile + body,
+        "sections": sections,
+        "layout": {
+            "stable_prefix_bytes": len(prefix_bytes),
+            "fingerprint": hashlib.sha256(prefix_bytes).hexdigest()[:16],
+        },
+    }
+
+
+def compile_imports(file_path: Path, skill_memo: Optional[Dict[str, Dict]] = None,
+                    target: Dict = CLAUDE_CODE_TARGET, log: Callable[[str], None] = log_stderr) -> Dict:
+    """
+    Process @ references in system prompt file.
+
+    - Skips frontmatter (---...---)
+    - Expands @ references to skill content, recursively
+    - Includes each skill once, even when imported more than once
+    - Fails on missing imports and on import cycles
+    - Adds header with skill manifest
+    - Adds the target's precedence instruction
+    - With a compact target, compacts imported skills (see _compact_text)
+    - With a stable target, uses the stable-prefix layout (see _assemble_stable)
+
+    Returns {prompt, imports, dependencies, sections} where dependencies
+    lists every file that was read to build the prompt (used for cache
+    invalidation) and sections is the size ledger: one {name, kind, bytes}
+    per header, persona body, skill and enforcement index, in prompt order.
+    With a compact target the result also carries compaction: bytes saved
+    by category ({frontmatter, duplicates, whitespace}); otherwise None.
+    layout is {stable_prefix_bytes, fingerprint} for a stable target,
+    otherwise None.
+    """
+    if skill_memo is None:
+        skill_memo = {}
+
+    state = {
+        "result": [],
+        "imports": [],
+        "embedded_metadata": [],
+        "errors": [],
+        "dependencies": [file_path],
+        "sections": [],
+        "seen": set(),
+        "log": log,
+        "compaction": {"frontmatter": 0, "duplicates": 0, "whitespace": 0} if target.get("compact") else None,
+        "paragraphs": set(),
+        "stable": bool(target.get("stable")),
+        "skill_chunks": [],
+    }
+    stack = [str(file_path.resolve())]
+    persona_section = {"name": file_path.stem, "kind": "persona", "bytes": 0}
+    state["sections"].append(persona_section)
+
+    with open(file_path) as f:
+        count_read(os.fstat(f.fileno()).st_size)
+        first_line = f.readline().strip()
+        if first_line == "---":
+            for line in f:
+                if line.strip() == "---":
+                    break
+        else:
+            state["result"].append(first_line + "\n")
+            persona_section["bytes"] += len(first_line.encode("utf-8")) + 1
+
+        for line in f:
+            match = IMPORT_PATTERN.match(line)
+            if match:
+                _expand_import(resolve_import_path(match.group(1), file_path.parent), skill_memo, state, stack)
+            else:
+                state["result"].append(line)
+                persona_section["bytes"] += len(line.encode("utf-8"))
+
+    errors = state["errors"]
+    if errors:
+        log(f"\nERROR: Failed to load {len(errors)} import(s):")
+        for err in errors:
+            log(f"  - {err}")
+        sys.exit(1)
+
+    imports = state["imports"]
+    if imports:
+        log(f"\nLoaded {len(imports)} skill(s) successfully")
+
+    if state["stable"]:
+        return {
+            **_assemble_stable(state, target, persona_section),
+            "imports": imports,
+            "dependencies": state["dependencies"],
+            "compaction": state["compaction"],
+        }
+
+    header = "---\n"
+    if imports:
+        header += _skill_manifest(imports)
+    header += _precedence_block(target)
+
+    body = "".join(state["result"])
+    enforcement = build_enforcement_index(state["embedded_metadata"])
+    sections = [{"name": "header", "kind": "header", "bytes": len(header.encode("utf-8"))}]
+    sections += state["sections"]
+    if enforcement:
+        sections.append({"name": "enforcement index", "kind": "index", "bytes": len(enforcement.encode("utf-8"))})
+    return {
+        "prompt": header + body + enforcement,
+        "imports": imports,
+        "dependencies": state["dependencies"],
+        "sections": sections,
+        "compaction": state["compaction"],
+        "layout": None,
+    }
+
+
+def estimate_tokens(nbytes: int) -> int:
+    """Approximate token count for prompt text (about 4 bytes per token)."""
+    return (nbytes + 3) // 4
+
+
+def compile_prompt(file_path: Path, cache_mode: str = CACHE_USE, skill_memo: Optional[Dict[str, Dict]] = None,
+                   target: Dict = CLAUDE_CODE_TARGET, log: Callable[[str], None] = log_stderr) -> Dict:
+    """
+    Build the system prompt for a persona file, reusing the compiled-prompt
+    cache when none of its dependencies have changed.
+
+    cache_mode: CACHE_USE (read + write), CACHE_REBUILD (write only) or
+    CACHE_OFF (bypass the cache entirely).
+
+    Returns {prompt, imports, dependencies, sections, compaction, layout}
+    (see compile_imports).
+    """
+    if cache_mode == CACHE_USE:
+        entry = cache_lookup(file_path, target)
+        if entry:
+            for imp in entry["imports"]:
+                log(f"  ✓ Cached: {imp['id'].split(':', 1)[1]}")
+            if entry["imports"]:
+                log(f"\nLoaded {len(entry['imports'])} skill(s) from cache")
+            return {
+                "prompt": entry["prompt"],
+                "imports": entry["imports"],
+                "dependencies": [Path(dep["path"]) for dep in entry["dependencies"]],
+                "sections": entry["sections"],
+                "compaction": entry["compaction"],
+                "layout": entry["layout"],
+            }
+
+    compiled = compile_imports(file_path, skill_memo, target, log)
+    if cache_mode != CACHE_OFF:
+        cache_store(file_path, compiled, target, log)
+    return compiled
+
+# ============================================================================
+# Compiled Prompt Cache
+# ============================================================================
+
+def _file_digest(file_path: Path) -> str:
+    with open(file_path, "rb") as f:
+        data = f.read()
+    count_read(len(data))
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_entry_path(file_path: Path, target: Dict) -> Path:
+    source = f"{target['name']}:{file_path.resolve()}"
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+    return PROMPT_CACHE_DIR / f"{key}.json"
+
+
+def fingerprint_dependencies(paths: List[Path]) -> List[Dict]:
+    """Record path, mtime, size and content hash for each dependency."""
+    fingerprints = []
+    seen = set()
+    for path in [LIBRARY_FILE] + list(paths):
+        resolved = str(Path(path).resolve())
+        if resolved in seen:
+            continue
+        seen.add(resolved)
+        stat = os.stat(resolved)
+        fingerprints.append({
+            "path": resolved,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": _file_digest(Path(resolved)),
+        })
+    return fingerprints
+
+
+def dependencies_fresh(fingerprints: List[Dict]) -> bool:
+    """
+    Check recorded dependencies against the filesystem.
+
+    A matching mtime and size is trusted without reading the file. When only
+    the mtime moved (touch, git checkout) the content hash decides.
+    """
+    for dep in fingerprints:
+        try:
+            stat = os.stat(dep["path"])
+        except OSError:
+            return False
+        if stat.st_size != dep["size"]:
+            return False
+        if stat.st_mtime_ns == dep["mtime_ns"]:
+            continue
+        if _file_digest(Path(dep["path"])) != dep["sha256"]:
+            return False
+        dep["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def cache_lookup(file_path: Path, target: Dict = CLAUDE_CODE_TARGET) -> Optional[Dict]:
+    """Return the cached compile result for file_path if still valid."""
+    entry_path = _cache_entry_path(file_path, target)
+    try:
+        with open(entry_path) as f:
+            count_read(os.fstat(f.fileno()).st_size)
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("version") != CACHE_VERSION:
+        return None
+    if not dependencies_fresh(entry["dependencies"]):
+        return None
+
+    # Bump mtime so eviction is least-recently-used
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass
+    return entry
+
+
+def cache_store(file_path: Path, compiled: Dict, target: Dict = CLAUDE_CODE_TARGET,
+                log: Callable[[str], None] = log_stderr) -> None:
+    """Persist a compile result and evict old entries. Failures are non-fatal."""
+    entry = {
+        "version": CACHE_VERSION,
+        "source": str(file_path.resolve()),
+        "target": target["name"],
+        "prompt": compiled["prompt"],
+        "imports": compiled["imports"],
+        "sections": compiled["sections"],
+        "compaction": compiled["compaction"],
+        "layout": compiled["layout"],
+        "dependencies": fingerprint_dependencies(compiled["dependencies"]),
+    }
+    entry_path = _cache_entry_path(file_path, target)
+    try:
+        PROMPT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomic(entry_path, json.dumps(entry))
+        prune_cache()
+    except OSError as e:
+        log(f"  ⚠ Could not write prompt cache: {e}")
+
+
+def prune_cache(max_bytes: int = CACHE_MAX_BYTES, max_entries: int = CACHE_MAX_ENTRIES,
+                directory: Optional[Path] = None, pattern: str = "*.json",
+                name_pattern: Optional[re.Pattern] = None) -> None:
+    """
+    Evict least-recently-used entries until the cache fits its bounds.
+
+    With name_pattern, only files whose name matches it count as entries;
+    anything else in the directory is left alone.
+    """
+    if directory is None:
+        directory = PROMPT_CACHE_DIR
+
+    entries = []
+    for entry_path in directory.glob(pattern):
+        if entry_path.name.startswith("."):
+            continue
+        if name_pattern and not name_pattern.match(entry_path.name):
+            continue
+        try:
+            stat = entry_path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    while entries and (total > max_bytes or len(entries) > max_entries):
+        _, size, entry_path = entries.pop(0)
+        try:
+            entry_path.unlink()
+        except OSError:
+            pass
+        total -= size
+
+
+def write_content_addressed(directory: Path, content: str, suffix: str) -> Path:
+    """
+    Store content in a file named by its sha256 and return the path.
+
+    Identical content maps to the same file, so an unchanged prompt is never
+    rewritten (its mtime is bumped for LRU eviction instead) and concurrent
+    launches can never clobber each other's files.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+    path = directory / f"{digest}{suffix}"
+    if path.exists():
+        os.utime(path)
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, content)
+    # The directory may be user-supplied (CLAUDE_LAUNCHER_DEBUG_DIR): prune only our own files
+    prune_cache(directory=directory, pattern="*", name_pattern=CONTENT_ADDRESSED_NAME)
+    return path
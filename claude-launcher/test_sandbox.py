@@ -0,0 +1,107 @@
+"""
+Tests for warm sandbox reuse, against a stub `docker` on PATH.
+
+The stub answers `docker image inspect` with the image ID in its
+image-id file (failing if there is none) and logs every call, so the
+tests can change the template digest and see which commands ran.
+
+Run from this directory: python3 -m pytest test_sandbox.py
+(or python3 -m unittest test_sandbox).
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+spec = importlib.util.spec_from_file_location("claude_launcher", Path(__file__).with_name("claude-launcher.py"))
+launcher = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(launcher)
+
+# Shell builtins only: PATH holds nothing but the stub
+STUB_DOCKER = """#!/bin/sh
+echo "$*" >> "${0%/*}/calls"
+if [ "$1 $2" = "image inspect" ]; then
+    read -r id < "${0%/*}/image-id" 2>/dev/null || exit 1
+    echo "$id"
+fi
+"""
+
+REPO = "/work/app"
+
+
+class SandboxReuseTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.bin = self.tmp / "bin"
+        self.bin.mkdir()
+        docker = self.bin / "docker"
+        docker.write_text(STUB_DOCKER)
+        docker.chmod(0o755)
+        for patch in (mock.patch.dict(os.environ, {"PATH": str(self.bin)}),
+                      mock.patch.object(launcher, "CACHE_DIR", self.tmp / "cache"),
+                      mock.patch.object(launcher, "SANDBOX_STATE", self.tmp / "cache" / "sandboxes.json")):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def set_digest(self, digest):
+        (self.bin / "image-id").write_text(digest + "\n")
+
+    def launch(self, fresh=False):
+        """Run sandbox_command; return (cmd, status line, docker calls made)."""
+        calls = self.bin / "calls"
+        if calls.exists():
+            calls.unlink()
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            cmd = launcher.sandbox_command(REPO, ["--model", "opus"], fresh)
+        made = calls.read_text().splitlines() if calls.exists() else []
+        return cmd, stderr.getvalue().strip(), made
+
+    def test_reused_while_warm_and_rebuilt_after_the_digest_changes(self):
+        self.set_digest("sha256:one")
+        cmd, status, calls = self.launch()
+        self.assertEqual(status, "Sandbox: recreating claude-app (first launch)")
+        self.assertIn("sandbox rm claude-app", calls)
+        self.assertNotIn("--pull-template", cmd)
+
+        cmd, status, calls = self.launch()
+        self.assertEqual(status, "Sandbox: reusing claude-app")
+        self.assertNotIn("sandbox rm claude-app", calls)
+        self.assertEqual(cmd[:3], ["docker", "sandbox", "run"])
+
+        self.set_digest("sha256:two")
+        cmd, status, calls = self.launch()
+        self.assertEqual(status, "Sandbox: recreating claude-app (template changed)")
+        self.assertIn("sandbox rm claude-app", calls)
+
+        _, status, _ = self.launch()
+        self.assertEqual(status, "Sandbox: reusing claude-app")
+
+    def test_fresh_always_rebuilds(self):
+        self.set_digest("sha256:one")
+        self.launch()
+        _, status, calls = self.launch(fresh=True)
+        self.assertEqual(status, "Sandbox: recreating claude-app (--fresh)")
+        self.assertIn("pull --quiet docker/sandbox-templates:claude-code", calls)
+
+    def test_unresolved_template_falls_back_to_a_cold_sandbox(self):
+        cmd, status, _ = self.launch()
+        self.assertIn("can't resolve", status)
+        self.assertEqual(cmd[3:5], ["--pull-template", "always"])
+
+    def test_missing_docker_falls_back_to_a_cold_sandbox(self):
+        (self.bin / "docker").unlink()
+        cmd, status, _ = self.launch()
+        self.assertIn("can't resolve", status)
+        self.assertEqual(cmd[3:5], ["--pull-template", "always"])
+
+
+if __name__ == "__main__":
+    unittest.main()
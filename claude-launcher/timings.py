@@ -0,0 +1,107 @@
+"""
+Timings - Lightweight span API for launcher startup profiling.
+
+Disabled by default: span() and the I/O counters are no-ops until
+enable() is called, so instrumentation costs nothing on normal launches.
+
+    with span("discovery"):
+        ...
+    count_read(len(data))
+
+Each completed span records wall time plus the files and bytes read and
+written while it was open (nested spans included).
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_enabled = False
+_spans: List[Dict] = []
+_depth = 0
+_counters = {"files_read": 0, "bytes_read": 0, "files_written": 0, "bytes_written": 0}
+_started = time.perf_counter()
+
+
+def enable() -> None:
+    global _enabled, _started
+    _enabled = True
+    _started = time.perf_counter()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def count_read(nbytes: int) -> None:
+    if _enabled:
+        _counters["files_read"] += 1
+        _counters["bytes_read"] += nbytes
+
+
+def count_write(nbytes: int) -> None:
+    if _enabled:
+        _counters["files_written"] += 1
+        _counters["bytes_written"] += nbytes
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a phase of the launch. Spans may nest.
+
+    Spans opened on worker threads are not recorded; time the pool as a
+    whole from the main thread instead.
+    """
+    global _depth
+    if not _enabled or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    before = dict(_counters)
+    start = time.perf_counter()
+    record = {"name": name, "depth": _depth}
+    _spans.append(record)
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        record["ms"] = (time.perf_counter() - start) * 1000
+        for key, value in _counters.items():
+            record[key] = value - before[key]
+
+
+def report(context: Optional[Dict] = None, jsonl_path: Optional[Path] = None) -> None:
+    """Print the span table to stderr and optionally append a JSON line."""
+    if not _enabled:
+        return
+
+    total_ms = (time.perf_counter() - _started) * 1000
+    print(f"\n{'phase':<32} {'ms':>9} {'reads':>6} {'read bytes':>11} {'writes':>6} {'write bytes':>11}",
+          file=sys.stderr)
+    for record in _spans:
+        name = "  " * record["depth"] + record["name"]
+        print(f"{name:<32} {record.get('ms', 0.0):>9.2f} {record.get('files_read', 0):>6} "
+              f"{record.get('bytes_read', 0):>11} {record.get('files_written', 0):>6} "
+              f"{record.get('bytes_written', 0):>11}", file=sys.stderr)
+    print(f"{'total':<32} {total_ms:>9.2f} {_counters['files_read']:>6} {_counters['bytes_read']:>11} "
+          f"{_counters['files_written']:>6} {_counters['bytes_written']:>11}", file=sys.stderr)
+
+    if jsonl_path:
+        line = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "total_ms": round(total_ms, 3),
+            **_counters,
+            **(context or {}),
+            "spans": [{**r, "ms": round(r.get("ms", 0.0), 3)} for r in _spans],
+        }
+        try:
+            with open(jsonl_path, "a") as f:
+                f.write(json.dumps(line) + "\n")
+        except OSError as e:
+            print(f"  ⚠ Could not append timings to {jsonl_path}: {e}", file=sys.stderr)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Review Cache - Lets /full-review re-review only what changed.
+
+Findings are cached per (file content hash, rules file hash). A file whose
+content and rules are unchanged since its last review keeps its cached
+findings; only the rest goes to reviewer subagents. Editing the rules
+file invalidates every file.
+
+Content hashes are git blob ids, the same ids the automatic-code-review
+hook records, computed in-process. A file whose size and mtime are
+unchanged is not re-read.
+
+The cache lives in ~/.cache/full-codebase-review/<encoded project path>/
+(or $XDG_CACHE_HOME/full-codebase-review/):
+
+- cache.json  {content hash: {rules hash: findings}} plus the stat shortcut
+- plan.json   the files, hashes and chunks of the current run
+
+Usage:
+    python3 review-cache.py plan [--scope PATH] [--all] [--chunk-bytes N] [--max-files N]
+    python3 review-cache.py record CHUNK RESPONSE_FILE
+    python3 review-cache.py findings
+
+plan lists the files to review, split into chunks balanced by size.
+record parses one reviewer response and caches its findings per file.
+findings prints every finding of the run, cached and new, in the
+reviewer's format.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+XDG_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+CACHE_ROOT = XDG_CACHE / "full-codebase-review"
+CACHE_VERSION = 1
+
+DEFAULT_RULES_FILE = ".claude/automatic-code-review/rules.md"
+DEFAULT_EXTENSIONS = ["ts", "tsx"]
+TEST_FILE = re.compile(r"\.(spec|test)\.[^.]+$")
+SKIPPED_DIRS = {".git", "node_modules", "dist", "build", "coverage"}
+
+# The reviewer's violation format: "1. [RULE NAME] - path/to/file.ts:42"
+VIOLATION = re.compile(r"^\s*\d+\.\s+\[(?P<rule>[^\]]+)\]\s+-\s+`?(?P<file>[^\s:`]+)`?(?::(?P<line>\d+))?")
+DETAIL = re.compile(r"^(Issue|Fix):")
+# An explicit pass verdict on a line of its own ("✅ PASS", "STATUS: PASS")
+PASS_STATUS = re.compile(r"^\s*(?:✅\s*)?(?:STATUS:\s*)?PASS\s*$", re.MULTILINE)
+
+
+# ============================================================================
+# Project
+# ============================================================================
+
+def project_root() -> Path:
+    try:
+        top = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True)
+        return Path(top.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return Path.cwd()
+
+
+def cache_dir(root: Path) -> Path:
+    """Per project, named the way Claude Code names its project directories."""
+    return CACHE_ROOT / "".join(c if c.isalnum() else "-" for c in str(root))
+
+
+def review_settings(root: Path) -> Dict:
+    """automaticCodeReview from .claude/settings.json, with the plugin's defaults."""
+    try:
+        settings = json.loads((root / ".claude" / "settings.json").read_text()).get("automaticCodeReview") or {}
+    except (OSError, ValueError, AttributeError):
+        settings = {}
+    return {
+        "rulesFile": settings.get("rulesFile") or DEFAULT_RULES_FILE,
+        "fileExtensions": settings.get("fileExtensions") or DEFAULT_EXTENSIONS,
+    }
+
+
+def discover(root: Path, scope: Path, extensions: List[str]) -> List[str]:
+    """Source files under scope, relative to root; .gitignore applies in a git repository."""
+    suffixes = tuple(f".{ext}" for ext in extensions)
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", str(scope)],
+            cwd=root, capture_output=True, check=True)
+        files = [f for f in listed.stdout.decode("utf-8", "replace").split("\0") if f.endswith(suffixes)]
+    except (OSError, subprocess.CalledProcessError):
+        files = []
+        for directory, dirs, names in os.walk(scope):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            files += [os.path.relpath(os.path.join(directory, n), root) for n in names if n.endswith(suffixes)]
+    # ls-files also lists tracked files that were deleted from the working tree
+    return sorted(f for f in files if (root / f).is_file())
+
+
+def blob_hash(data: bytes) -> str:
+    """The git blob id of data, as `git hash-object` prints it."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+def load_json(path: Path, empty: Dict) -> Dict:
+    try:
+        data = json.loads(path.read_text())
+        if data.get("version") == CACHE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return empty
+
+
+def save_json(path: Path, data: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def load_cache(directory: Path) -> Dict:
+    return load_json(directory / "cache.json", {"version": CACHE_VERSION, "results": {}, "stat": {}})
+
+
+def hash_files(root: Path, files: List[str], stat_cache: Dict) -> Dict[str, Dict]:
+    """{path: {hash, bytes}}, reusing stat_cache entries whose size and mtime still match."""
+    hashed = {}
+    for path in files:
+        stat = (root / path).stat()
+        cached = stat_cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            digest = cached[2]
+        else:
+            digest = blob_hash((root / path).read_bytes())
+            stat_cache[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        hashed[path] = {"hash": digest, "bytes": stat.st_size}
+    return hashed
+
+
+def chunk_files(files: Dict[str, Dict], chunk_bytes: int, max_files: int) -> List[Dict]:
+    """
+    Split files into chunks of similar total size: largest file first, each
+    into the smallest chunk that still has room. Deterministic.
+    """
+    if not files:
+        return []
+    total = sum(f["bytes"] for f in files.values())
+    count = max(math.ceil(total / chunk_bytes), math.ceil(len(files) / max_files))
+    chunks = [{"files": [], "bytes": 0} for _ in range(count)]
+    for path in sorted(files, key=lambda p: (-files[p]["bytes"], p)):
+        target = min((c for c in chunks if len(c["files"]) < max_files), key=lambda c: c["bytes"])
+        target["files"].append(path)
+        target["bytes"] += files[path]["bytes"]
+    chunks = [c for c in chunks if c["files"]]
+    for number, chunk in enumerate(chunks, 1):
+        chunk["files"].sort()
+        chunk["id"] = number
+    return chunks
+
+
+# ============================================================================
+# Reviewer Responses
+# ============================================================================
+
+def parse_violations(text: str) -> List[Dict]:
+    """Violations in the reviewer's numbered format: rule, file, line and the detail lines under it."""
+    violations = []
+    current = None
+    for line in text.splitlines():
+        match = VIOLATION.match(line)
+        if match:
+            current = {
+                "rule": match.group("rule").strip(),
+                "file": match.group("file"),
+                "line": int(match.group("line")) if match.group("line") else None,
+                "detail": [],
+            }
+            violations.append(current)
+        elif current is not None and line.strip() and (line[:1].isspace() or DETAIL.match(line)):
+            current["detail"].append(line.strip())
+        elif current is not None and line.strip():
+            current = None
+    return violations
+
+
+def attribute(reference: str, files: List[str]) -> Optional[str]:
+    """The chunk file a violation refers to: an exact path, or a unique path suffix."""
+    if reference.startswith("./"):
+        reference = reference[2:]
+    if reference in files:
+        return reference
+    matches = [f for f in files if f.endswith("/" + reference)]
+    return matches[0] if len(matches) == 1 else None
+
+
+# ============================================================================
+# Commands
+# ============================================================================
+
+def plan(args, root: Path, directory: Path) -> None:
+    settings = review_settings(root)
+    rules_path = root / settings["rulesFile"]
+    rules_hash = blob_hash(rules_path.read_bytes()) if rules_path.is_file() else "missing"
+    scope = (root / args.scope).resolve() if args.scope else root
+
+    cache = load_cache(directory)
+    files = hash_files(root, discover(root, scope, settings["fileExtensions"]), cache["stat"])
+    if not args.scope:
+        # A full run sees every file, so entries for files that are gone can go
+        current = {f["hash"] for f in files.values()}
+        cache["results"] = {h: r for h, r in cache["results"].items() if h in current}
+        cache["stat"] = {p: s for p, s in cache["stat"].items() if p in files}
+    save_json(directory / "cache.json", cache)
+
+    def cached(path: str) -> bool:
+        return not args.all and rules_hash in cache["results"].get(files[path]["hash"], {})
+
+    to_review = {path: info for path, info in files.items() if not cached(path)}
+    chunks = chunk_files(to_review, args.chunk_bytes, args.max_files)
+    run = {
+        "version": CACHE_VERSION,
+        "root": str(root),
+        "rules_file": settings["rulesFile"],
+        "rules_found": rules_path.is_file(),
+        "rules_hash": rules_hash,
+        "files": files,
+        "production": [p for p in files if not TEST_FILE.search(p)],
+        "test": [p for p in files if TEST_FILE.search(p)],
+        "cached": len(files) - len(to_review),
+        "chunks": chunks,
+    }
+    save_json(directory / "plan.json", run)
+
+    print(json.dumps({
+        "plan": str(directory / "plan.json"),
+        "rules_file": run["rules_file"],
+        "rules_found": run["rules_found"],
+        "files": len(files),
+        "production_files": len(run["production"]),
+        "test_files": len(run["test"]),
+        "cached": run["cached"],
+        "to_review": len(to_review),
+        "chunks": [{"id": c["id"], "bytes": c["bytes"], "files": c["files"]} for c in chunks],
+    }, indent=2))
+
+
+def record(args, root: Path, directory: Path) -> None:
+    run = load_json(directory / "plan.json", {})
+    chunk = next((c for c in run.get("chunks", []) if c["id"] == args.chunk), None)
+    if not chunk:
+        sys.exit(f"✗ No chunk {args.chunk} in the current plan; run `review-cache.py plan` first")
+
+    response = args.response.read_text(encoding="utf-8")
+    violations = parse_violations(response)
+    # Without violations, only an explicit PASS line means the files are clean (not a failed review)
+    if not violations and not PASS_STATUS.search(response):
+        sys.exit(f"✗ Chunk {args.chunk} not cached; the response has neither violations nor a PASS status line")
+
+    findings: Dict[str, List[Dict]] = {path: [] for path in chunk["files"]}
+    unattributed = []
+    for violation in violations:
+        path = attribute(violation.pop("file"), chunk["files"])
+        if path:
+            findings[path].append(violation)
+        else:
+            unattributed.append(violation)
+    # A finding that can't be tied to a file would be lost on the next run, so nothing is cached
+    if unattributed:
+        for violation in unattributed:
+            print(f"⚠ Can't tell which file [{violation['rule']}] refers to", file=sys.stderr)
+        sys.exit(f"✗ Chunk {args.chunk} not cached; re-run its review with full file paths")
+
+    cache = load_cache(directory)
+    for path, file_findings in findings.items():
+        cache["results"].setdefault(run["files"][path]["hash"], {})[run["rules_hash"]] = file_findings
+    save_json(directory / "cache.json", cache)
+    total = sum(len(f) for f in findings.values())
+    print(f"✓ Chunk {args.chunk}: {len(findings)} files cached, {total} violations")
+
+
+def print_findings(args, root: Path, directory: Path) -> None:
+    run = load_json(directory / "plan.json", {})
+    if not run:
+        sys.exit("✗ No plan; run `review-cache.py plan` first")
+    results = load_cache(directory)["results"]
+
+    missing = []
+    number = 0
+    for path, info in run["files"].items():
+        file_findings = results.get(info["hash"], {}).get(run["rules_hash"])
+        if file_findings is None:
+            missing.append(path)
+            continue
+        for finding in file_findings:
+            number += 1
+            line = f":{finding['line']}" if finding["line"] else ""
+            print(f"{number}. [{finding['rule']}] - {path}{line}")
+            for detail in finding["detail"]:
+                print(f"   {detail}")
+            print()
+
+    reviewed = len(run["files"]) - len(missing)
+    print(f"{number} violations in {reviewed} reviewed files ({run['cached']} from cache)")
+    if missing:
+        print(f"⚠ {len(missing)} files have no review result yet: {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental full-codebase review cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    plan_parser = sub.add_parser("plan", help="list the files to review and chunk them")
+    plan_parser.add_argument("--scope", help="only files under this path")
+    plan_parser.add_argument("--all", action="store_true", help="review every file, ignoring cached results")
+    plan_parser.add_argument("--chunk-bytes", type=int, default=150_000,
+                             help="target source bytes per chunk (default: 150000)")
+    plan_parser.add_argument("--max-files", type=int, default=30, help="files per chunk at most (default: 30)")
+    record_parser = sub.add_parser("record", help="cache one chunk's reviewer response")
+    record_parser.add_argument("chunk", type=int)
+    record_parser.add_argument("response", type=Path, help="file holding the reviewer's response")
+    sub.add_parser("findings", help="print every finding of the current plan")
+    args = parser.parse_args()
+
+    root = project_root()
+    directory = cache_dir(root)
+    {"plan": plan, "record": record, "findings": print_findings}[args.command](args, root, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,161 +5,183 @@ Generate OpenCode Agents - Creates agent definitions from system prompts.
 Reads all personas from system-prompts/ and generates OpenCode agent
 markdown files in ~/.config/opencode/agents/
 
+Discovery, @ import processing and the compiled prompt cache are shared
+with the Claude launcher (claude-launcher/prompt_assembly.py).
+
+Builds are incremental: a manifest records the input files of every
+generated agent, so unchanged agents are skipped and files are only
+rewritten when their content differs. Changed personas are compiled
+concurrently.
+
 Usage:
-    python3 generate-opencode-agents.py
+    python3 generate-opencode-agents.py [--force] [--jobs N]
     generate-opencode-agents    # if in PATH
+
+Options:
+    --force     Regenerate every agent, ignoring the manifest and prompt cache
+    --jobs N    Number of worker threads (default: CPU count)
 """
 
+import json
 import os
-import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude-launcher"))
+
+from prompt_assembly import (
+    CACHE_REBUILD,
+    CACHE_USE,
+    OPENCODE_TARGET,
+    compile_prompt,
+    dependencies_fresh,
+    fingerprint_dependencies,
+    load_catalog,
+    render_target,
+    write_atomic,
+)
 
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
-LAUNCHER_DIR = Path(__file__).parent.parent
-SYSTEM_PROMPTS_DIR = LAUNCHER_DIR / "system-prompts"
-GLOBAL_PROMPTS_DIR = Path.home() / ".claude" / "system-prompts"
 OPENCODE_AGENTS_DIR = Path.home() / ".config" / "opencode" / "agents"
+MANIFEST_FILE = OPENCODE_AGENTS_DIR / ".generate-opencode-agents.json"
+GENERATOR_FILE = Path(__file__).resolve()
+MANIFEST_VERSION = 2
 
 
 # ============================================================================
-# Data Parsing (copied from claude-launcher.py)
+# Incremental Build
 # ============================================================================
 
 
-def parse_frontmatter(file_path: Path) -> Dict[str, str]:
-    """Parse YAML frontmatter from prompt file."""
-    metadata = {}
+def load_manifest() -> Dict:
     try:
-        with open(file_path) as f:
-            first_line = f.readline().strip()
-            if first_line != "---":
-                return metadata
-
-            for line in f:
-                line = line.strip()
-                if line == "---":
-                    break
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    metadata[key.strip()] = value.strip()
-    except Exception as e:
-        print(f"Error parsing {file_path}: {e}", file=sys.stderr)
-
-    return metadata
-
-
-def build_enforcement_index(embedded_metadata: list) -> str:
-    if not embedded_metadata:
-        return ""
-
-    lines = [
-        "\n---\n",
-        "\n## Skill Activation Protocol\n",
-        f"You have {len(embedded_metadata)} embedded skills. They are ALL active for this session.",
-        "IF A SKILL APPLIES TO YOUR TASK, YOU DO NOT HAVE A CHOICE. YOU MUST USE IT. THIS IS NOT NEGOTIABLE.",
-        "If you catch yourself violating a skill, STOP IMMEDIATELY, re-read the skill, and correct course.",
-        "Before EVERY action, check: does this violate any embedded skill? If yes, DO NOT PROCEED.\n",
-        "### Embedded Skills\n",
-    ]
-    for meta in embedded_metadata:
-        lines.append(f"- **{meta['name']}**: {meta['description']}")
-    return "\n".join(lines) + "\n"
-
-
-def process_imports(file_path: Path, persona_name: str) -> str:
-    """Process @ references and build system prompt."""
-    result = []
-    imports = []
-    embedded_metadata = []
-    errors = []
-
-    with open(file_path) as f:
-        first_line = f.readline().strip()
-        if first_line == "---":
-            for line in f:
-                if line.strip() == "---":
-                    break
-        else:
-            result.append(first_line + "\n")
-
-        for line in f:
-            match = re.match(r"^\s*-?\s*@([^\s]+)\s*$", line)
-            if match:
-                import_path = match.group(1)
-                import_path = import_path.replace("~", str(Path.home()))
-                if not import_path.startswith("/"):
-                    import_path = str(file_path.parent / import_path)
-
-                import_path = Path(import_path)
-                if import_path.exists():
-                    skill_dir = (
-                        import_path.parent.name
-                        if import_path.name == "SKILL.md"
-                        else import_path.stem
-                    )
-                    print(f"  ✓ Found: {skill_dir}", file=sys.stderr)
-                    skill_meta = parse_frontmatter(import_path)
-                    skill_id = f"development-skills:{skill_dir}"
-                    display_name = skill_meta.get("name", skill_dir)
-                    imports.append({"id": skill_id, "display_name": display_name})
-                    if "description" in skill_meta:
-                        embedded_metadata.append(
-                            {
-                                "name": skill_id,
-                                "description": skill_meta["description"]
-                                .strip('"')
-                                .strip("'"),
-                            }
-                        )
-                    with open(import_path) as skill_file:
-                        result.append(skill_file.read())
-                        result.append("\n\n")
-                else:
-                    print(
-                        f"  ✗ ERROR: Import file not found: {import_path}",
-                        file=sys.stderr,
-                    )
-                    errors.append(str(import_path))
-            else:
-                result.append(line)
-
-    if errors:
-        print(f"\nERROR: Failed to load {len(errors)} import(s):", file=sys.stderr)
-        for err in errors:
-            print(f"  - {err}", file=sys.stderr)
-        sys.exit(1)
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("agents", {})
 
-    header = "---\n"
 
-    if imports:
-        print(f"\nLoaded {len(imports)} skill(s) successfully", file=sys.stderr)
-        header += "\n# Loaded Skills\n\n"
-        header += (
-            "The following skills have been loaded and are active for this session:\n\n"
-        )
-        for imp in imports:
-            header += f"- **{imp['display_name']}** ({imp['id']})\n"
-        header += "\n---\n\n"
+def save_manifest(agents: Dict) -> None:
+    write_atomic(MANIFEST_FILE, json.dumps({"version": MANIFEST_VERSION, "agents": agents}, indent=2))
 
-    header += """# System Instructions
 
-## Precedence
-
-This persona system prompt takes precedence over the default system prompt. When there is a conflict, follow this system prompt's guidance.
-
----
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content atomically unless the file already holds it. Returns True if written."""
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    write_atomic(path, content)
+    return True
+
+
+def agent_is_current(entry: Optional[Dict], agent_file: Path) -> bool:
+    """An agent is current when its inputs are unchanged and its output is untouched."""
+    if not entry or not agent_file.exists():
+        return False
+    if not dependencies_fresh(entry["inputs"]):
+        return False
+    stat = agent_file.stat()
+    return stat.st_size == entry["output_size"] and stat.st_mtime_ns == entry["output_mtime_ns"]
+
+
+def slugify(name: str) -> str:
+    return (
+        name.lower()
+        .replace(" ", "-")
+        .replace("/", "-")
+        .replace(":", "")
+        .replace("\\", "")
+    )
+
+
+def build_agent(shortcut: str, file_path: Path, name: str, agent_file: Path, cache_mode: str) -> Dict:
+    """
+    Compile one persona into an OpenCode agent file.
+
+    Never raises: a persona that fails to compile (compile_prompt exits on a
+    missing import or a cycle) comes back with status "failed" and its log.
+    """
+    log = [f"Processing: {shortcut} → {name}"]
+    try:
+        compiled = compile_prompt(file_path, cache_mode, target=OPENCODE_TARGET, log=log.append)
+    except (SystemExit, Exception) as e:
+        detail = "" if isinstance(e, SystemExit) else f": {e}"
+        log.append(f"  ✗ Failed to compile {file_path}{detail}")
+        return {"log": log, "status": "failed", "entry": None}
+    content = render_target(OPENCODE_TARGET, name, compiled["prompt"])
+
+    if write_if_changed(agent_file, content):
+        log.append(f"  → Created: {agent_file.name}")
+        status = "written"
+    else:
+        log.append(f"  = Unchanged output: {agent_file.name}")
+        status = "unchanged"
+
+    stat = agent_file.stat()
+    entry = {
+        "source": str(file_path),
+        "inputs": fingerprint_dependencies(compiled["dependencies"] + [GENERATOR_FILE]),
+        "output_size": stat.st_size,
+        "output_mtime_ns": stat.st_mtime_ns,
+    }
+    return {"log": log, "status": status, "entry": entry}
+
+
+def usage_error(message: str) -> None:
+    print(message, file=sys.stderr)
+    print(__doc__, file=sys.stderr)
+    sys.exit(1)
+
+
+def parse_jobs(value: str) -> int:
+    try:
+        return max(1, int(value))
+    except ValueError:
+        usage_error(f"Invalid --jobs value: {value}")
+
+
+def parse_args(args: List[str]) -> Dict:
+    options = {"force": False, "jobs": os.cpu_count() or 4}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--force":
+            options["force"] = True
+        elif arg in ("-j", "--jobs") and i + 1 < len(args):
+            i += 1
+            options["jobs"] = parse_jobs(args[i])
+        elif arg.startswith("--jobs="):
+            options["jobs"] = parse_jobs(arg.split("=", 1)[1])
+        else:
+            usage_error(f"Unknown argument: {arg}")
+        i += 1
+    return options
 
-"""
 
-    body = "".join(result)
-    enforcement = build_enforcement_index(embedded_metadata)
-    return header + body + enforcement
+def discover_personas(cache_mode: str) -> Dict[str, Tuple[Path, Optional[str]]]:
+    """Map shortcut (or slugified name) to persona file for every solo persona."""
+    personas = {}
+    for entry in load_catalog(cache_mode):
+        if entry["kind"] != "solo":
+            continue
+        if entry["shortcut"]:
+            personas[entry["shortcut"]] = (Path(entry["path"]), entry["name"])
+        elif entry["name"]:
+            # Use lowercase name as shortcut fallback
+            personas[entry["name"].lower().replace(" ", "-")] = (Path(entry["path"]), entry["name"])
+    return personas
 
 
 # ============================================================================
@@ -168,24 +190,10 @@ This persona system prompt takes precedence over the default system prompt. When
 
 
 def main():
-    # Find all persona files
-    prompt_dirs = [SYSTEM_PROMPTS_DIR, GLOBAL_PROMPTS_DIR]
+    options = parse_args(sys.argv[1:])
+    cache_mode = CACHE_REBUILD if options["force"] else CACHE_USE
 
-    personas = {}
-    for prompt_dir in prompt_dirs:
-        if not prompt_dir.exists():
-            continue
-
-        for file_path in sorted(prompt_dir.glob("*.md")):
-            metadata = parse_frontmatter(file_path)
-
-            if "shortcut" in metadata:
-                shortcut = metadata["shortcut"]
-                personas[shortcut] = file_path
-            elif "name" in metadata:
-                # Use lowercase name as shortcut fallback
-                name = metadata["name"].lower().replace(" ", "-")
-                personas[name] = file_path
+    personas = discover_personas(cache_mode)
 
     if not personas:
         print("No personas found", file=sys.stderr)
@@ -197,38 +205,62 @@ def main():
     print(f"Generating OpenCode agents in {OPENCODE_AGENTS_DIR}")
     print(f"Found {len(personas)} personas\n")
 
-    # Generate agent files
-    for shortcut, file_path in sorted(personas.items()):
-        metadata = parse_frontmatter(file_path)
-        name = metadata.get("name") or file_path.stem
-
-        # Create slugified filename from full name
-        slug = (
-            name.lower()
-            .replace(" ", "-")
-            .replace("/", "-")
-            .replace(":", "")
-            .replace("\\", "")
-        )
-
-        print(f"Processing: {shortcut} → {name}")
-
-        # Build system prompt
-        system_prompt = process_imports(file_path, name)
-
-        # Create agent markdown file with full name
-        agent_file = OPENCODE_AGENTS_DIR / f"{slug}.md"
-
-        with open(agent_file, "w") as f:
-            f.write("---\n")
-            f.write(f"description: {name}\n")
-            f.write("mode: primary\n")
-            f.write("---\n")
-            f.write(system_prompt)
+    # --force rebuilds everything, but a persona that then fails to compile
+    # still falls back to its old entry, and stale files come from the old manifest
+    old_manifest = load_manifest()
+    previous = {} if options["force"] else old_manifest
+    manifest = {}
+    pending = []
+    skipped = 0
+
+    for shortcut, (file_path, persona_name) in sorted(personas.items()):
+        name = persona_name or file_path.stem
+        agent_file = OPENCODE_AGENTS_DIR / f"{slugify(name)}.md"
+        entry = previous.get(agent_file.name)
+
+        if agent_is_current(entry, agent_file) and entry["source"] == str(file_path):
+            manifest[agent_file.name] = entry
+            skipped += 1
+            continue
 
-        print(f"  → Created: {agent_file.name}")
+        pending.append((shortcut, file_path, name, agent_file, cache_mode))
+
+    # Compile changed personas concurrently; report in a stable order
+    written = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=options["jobs"]) as pool:
+        futures = [(job[3], pool.submit(build_agent, *job)) for job in pending]
+        for agent_file, future in futures:
+            outcome = future.result()
+            print("\n".join(outcome["log"]), file=sys.stderr if outcome["status"] == "failed" else sys.stdout)
+            if outcome["status"] == "failed":
+                failed.append(agent_file.name)
+                # Keep the previous agent file; its stale inputs make the next run retry it
+                if agent_file.name in old_manifest:
+                    manifest[agent_file.name] = old_manifest[agent_file.name]
+                continue
+            manifest[agent_file.name] = outcome["entry"]
+            if outcome["status"] == "written":
+                written += 1
+
+    # Remove agents we generated previously whose persona no longer exists
+    removed = 0
+    for stale_name in sorted(set(old_manifest) - set(manifest)):
+        stale_file = OPENCODE_AGENTS_DIR / stale_name
+        if stale_file.exists():
+            stale_file.unlink()
+            print(f"  ✗ Removed stale agent: {stale_name}")
+            removed += 1
+
+    save_manifest(manifest)
+
+    if failed:
+        print(f"\n✗ {len(failed)} of {len(personas)} agents failed: {', '.join(failed)}", file=sys.stderr)
+        print(f"  {written} written, {skipped} up to date, {removed} removed", file=sys.stderr)
+        sys.exit(1)
 
-    print(f"\n✓ Generated {len(personas)} agents")
+    print(f"\n✓ {len(personas)} agents: {written} written, {len(pending) - written} unchanged after rebuild, "
+          f"{skipped} up to date, {removed} removed")
     print(f"\nTo use:")
     print(f"  1. Run: opencode")
     print(f"  2. Press Tab or use @agent-name to switch personas")
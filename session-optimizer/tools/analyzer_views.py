@@ -0,0 +1,186 @@
+"""
+Analyzer Views - Per-analyzer, sharded views of a session transcript.
+
+Fed by condense-session.py's streaming pass (--views). Each of the four
+analyzers gets only what its checks need, split into shards at turn
+boundaries once a shard passes the byte budget:
+
+- conversation-efficiency-analyzer  the conversation: user text in full,
+                                    assistant text clipped, tool calls by
+                                    name only, short error lines
+- tool-and-skill-usage-analyzer     the actions: every tool call with its
+                                    input and result status, grouped per
+                                    assistant message; text clipped short
+- skill-compliance-analyzer         the actions against the skills: tool
+                                    calls with inputs, failed results,
+                                    user and assistant text clipped
+- context-and-skills-gap-analyzer   what the user had to supply and what
+                                    failed: user text in full, assistant
+                                    text clipped, failed results in detail
+
+stats.md (session stats) goes with every view; skills.md (only the
+system-reminders that mention skills) only with the views in SKILL_VIEWS.
+manifest.json lists each view's shared files, and its shards with their
+turn range and size.
+
+A turn starts at each user message. Shards hold whole turns where they
+can: a new shard starts at the next user message past the budget. Only a
+long autonomous turn is split, at the next assistant message once its shard
+reaches MID_TURN_FACTOR times the budget (marked "continued"). The same
+transcript and budget always give the same shards.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+VIEWS = [
+    "conversation-efficiency-analyzer",
+    "tool-and-skill-usage-analyzer",
+    "skill-compliance-analyzer",
+    "context-and-skills-gap-analyzer",
+]
+
+# Per view: chars kept of user text, assistant text, tool input and failed
+# tool results (None = in full, 0 = left out); whether successful results
+# get a status line. A clipped text still shows how long it was.
+VIEW_LIMITS = {
+    "conversation-efficiency-analyzer": {"user": None, "assistant": 400, "input": 0, "error": 120, "ok": False},
+    "tool-and-skill-usage-analyzer": {"user": 200, "assistant": 150, "input": 250, "error": 150, "ok": True},
+    "skill-compliance-analyzer": {"user": 300, "assistant": 300, "input": 250, "error": 200, "ok": False},
+    "context-and-skills-gap-analyzer": {"user": None, "assistant": 250, "input": 100, "error": 400, "ok": False},
+}
+
+# Views whose analyzer checks the loaded skills, and so gets skills.md
+SKILL_VIEWS = {"tool-and-skill-usage-analyzer", "skill-compliance-analyzer"}
+
+# A turn is split at an assistant message only past this multiple of the budget
+MID_TURN_FACTOR = 2
+
+
+def clip(text: str, limit: Optional[int]) -> str:
+    if limit is None or len(text) <= limit:
+        return text
+    if limit == 0:
+        return ""
+    return f"{text[:limit]}… [{len(text) - limit} more chars]"
+
+
+class ViewShards:
+    """The shard files of one view; rotates to a new shard at a turn boundary past the budget."""
+
+    def __init__(self, directory: Path, shard_bytes: int):
+        self.directory = directory
+        self.shard_bytes = shard_bytes
+        self.shards: List[Dict] = []
+        self.file: Optional[TextIO] = None
+        self.pending_heading: Optional[str] = None
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def boundary(self, turn: int, continued: bool = False) -> None:
+        """A possible shard boundary: a new turn, or a new assistant message within one."""
+        limit = self.shard_bytes * MID_TURN_FACTOR if continued else self.shard_bytes
+        if self.file is None or self.shards[-1]["bytes"] >= limit:
+            self._open(turn, continued)
+        self.shards[-1]["last_turn"] = turn
+
+    def _open(self, turn: int, continued: bool = False) -> None:
+        if self.file:
+            self.file.close()
+        path = self.directory / f"shard-{len(self.shards) + 1:03d}.md"
+        self.file = open(path, "w", encoding="utf-8")
+        self.shards.append({"path": str(path), "first_turn": turn, "last_turn": turn, "bytes": 0})
+        start = f"turn {turn}, continued" if continued else f"from turn {turn}"
+        pending, self.pending_heading = self.pending_heading, None
+        self.write(f"# Shard {len(self.shards)} ({start})\n")
+        self.pending_heading = pending
+
+    def write(self, text: str) -> None:
+        if self.file is None:
+            self._open(0)
+        if self.pending_heading:
+            heading, self.pending_heading = self.pending_heading, None
+            self.write(heading)
+        self.file.write(text)
+        self.shards[-1]["bytes"] += len(text.encode("utf-8"))
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class AnalyzerViews:
+    """Receives transcript events from the condenser and renders every view."""
+
+    def __init__(self, directory: Path, shard_bytes: int):
+        self.directory = directory
+        self.views = {name: ViewShards(directory / name, shard_bytes) for name in VIEWS}
+        self.skills_path = directory / "skills.md"
+        self.skills = open(self.skills_path, "w", encoding="utf-8")
+        self.skills.write("# Loaded Skills\n\nSystem-reminders that mention skills, each included once.\n\n")
+        self.skill_reminders = 0
+        self.turn = 0
+
+    def _each(self, render) -> None:
+        for name, view in self.views.items():
+            text = render(VIEW_LIMITS[name])
+            if text:
+                view.write(text)
+
+    def user(self, text: str, role: str, timestamp: str) -> None:
+        for view in self.views.values():
+            view.pending_heading = None
+            if role == "User":
+                view.boundary(self.turn + 1)
+        if role == "User":
+            self.turn += 1
+        heading = f"\n### Turn {self.turn}: {role} {timestamp}\n\n" if role == "User" else f"\n### {role} {timestamp}\n\n"
+        self._each(lambda limits: f"{heading}{clip(text, limits['user'])}\n")
+
+    def assistant_start(self, timestamp: str) -> None:
+        # Written lazily, so a view with nothing from this message gets no heading
+        for view in self.views.values():
+            view.boundary(self.turn, continued=True)
+            view.pending_heading = f"\n### Assistant {timestamp}\n\n"
+
+    def assistant_text(self, text: str) -> None:
+        self._each(lambda limits: f"{clip(text, limits['assistant'])}\n")
+
+    def tool_call(self, name: str, summary: str) -> None:
+        self._each(lambda limits: f"→ {name} {clip(summary, limits['input'])}".rstrip() + "\n")
+
+    def tool_result(self, text: str, is_error: bool) -> None:
+        def render(limits: Dict) -> Optional[str]:
+            if is_error:
+                return f"← error: {clip(text, limits['error'])}\n"
+            return f"← ok ({len(text)} chars)\n" if limits["ok"] else None
+        self._each(render)
+
+    def reminder(self, number: int, text: str) -> None:
+        """A new distinct system-reminder; only skill-related ones are kept."""
+        if "skill" in text.lower():
+            self.skill_reminders += 1
+            self.skills.write(f"### System-reminder #{number}\n\n{text.strip()}\n\n")
+
+    def compaction(self) -> None:
+        self._each(lambda limits: "\n--- conversation compacted ---\n")
+
+    def close(self, stats_text: str) -> Dict:
+        """Finish every view and write stats.md and manifest.json; returns the manifest."""
+        self.skills.close()
+        for view in self.views.values():
+            view.close()
+        stats_path = self.directory / "stats.md"
+        stats_path.write_text(stats_text, encoding="utf-8")
+        manifest = {
+            "stats": str(stats_path),
+            "skills": str(self.skills_path),
+            "skill_reminders": self.skill_reminders,
+            "turns": self.turn,
+            "shared": {name: [str(stats_path)] + ([str(self.skills_path)] if name in SKILL_VIEWS else [])
+                       for name in self.views},
+            "views": {name: view.shards for name, view in self.views.items()},
+        }
+        (self.directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        return manifest
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Condense Session - Streams a Claude Code session transcript (JSONL) into the
+condensed transcript and context files that /optimize-session hands to its
+analyzer subagents.
+
+One pass over the file, constant memory: entries are written out as they
+are read, and only counters are kept. Output:
+
+- <id>.transcript.md  user messages and assistant text in full, tool calls
+                      as name + input summary, tool results truncated
+- <id>.context.md     session stats plus every distinct system-reminder
+                      (loaded skills, available tools), each included once
+- <id>.tool-stats.json  exact tool-usage metrics: repeated calls, re-read
+                      files, error streaks, output bytes, latency (see
+                      tool_stats.py)
+- <id>.json           the stats and output paths, also printed to stdout
+- <id>.views/         with --views: per-analyzer views sharded by turns
+                      (see analyzer_views.py), listed in manifest.json
+
+Results are cached in ~/.cache/session-optimizer (or
+$XDG_CACHE_HOME/session-optimizer) and reused while the transcript's size
+and mtime are unchanged, so re-running on a finished session is free.
+Slugs, and ids from other projects, are resolved through the session
+index (session_index.py).
+
+Usage:
+    python3 condense-session.py [SESSION] [--project-dir DIR]
+                                [--max-tool-result N] [--max-tool-input N]
+                                [--views] [--shard-bytes N] [--force]
+
+    SESSION is a session UUID, a slug, or a path to a .jsonl file. Without
+    it, the most recently modified session of the current project is used.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, TextIO
+
+from analyzer_views import AnalyzerViews
+from session_index import INDEX_PATH, PROJECTS_DIR, SessionIndex, project_name
+from tool_stats import ToolStats
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "session-optimizer"
+CACHE_VERSION = 3
+CACHE_KEEP = 20
+
+# Entry types that carry no conversation content
+SKIPPED_TYPES = {"file-history-snapshot", "queue-operation", "last-prompt", "summary"}
+
+REMINDER_PATTERN = re.compile(r"<system-reminder>.*?</system-reminder>", re.DOTALL)
+
+
+# ============================================================================
+# Locating Sessions
+# ============================================================================
+
+def find_session(session: Optional[str], project_dir: Path, index: SessionIndex) -> Path:
+    """Resolve a UUID, slug or path to a transcript file (default: most recent in project_dir)."""
+    if session and session.endswith(".jsonl") and Path(session).exists():
+        return Path(session)
+
+    if not session:
+        transcripts = sorted(project_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        if not transcripts:
+            sys.exit(f"✗ No session transcripts in {project_dir}")
+        return transcripts[0]
+
+    by_id = project_dir / f"{session}.jsonl"
+    if by_id.exists():
+        return by_id
+
+    # Slugs, and ids from other projects, come from the session index (kept up to date by the caller)
+    found = index.lookup(session)
+    if not found:
+        sys.exit(f"✗ No session with id or slug '{session}'")
+    return Path(found["path"])
+
+
+# ============================================================================
+# Condensing
+# ============================================================================
+
+def truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}… [{len(text) - limit} more chars]"
+
+
+def block_text(content) -> str:
+    """Flatten a message or tool_result content (str or list of blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, dict):
+                if block.get("type") == "text":
+                    parts.append(block.get("text", ""))
+                elif block.get("type") == "image":
+                    parts.append("[image]")
+            elif isinstance(block, str):
+                parts.append(block)
+        return "\n".join(parts)
+    return ""
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def read_entries(path: Path) -> Iterator[Dict]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                yield entry
+
+
+class Condenser:
+    """
+    Writes the condensed transcript while accumulating stats.
+
+    System-reminders are moved to the reminders stream, once per distinct
+    text; the transcript keeps a `[system-reminder #n]` marker in place.
+    Tool calls and results also go to the tool stats; with views, every
+    event is passed on to the analyzer views too.
+    """
+
+    def __init__(self, transcript: TextIO, reminders: TextIO, max_tool_result: int, max_tool_input: int,
+                 views: Optional[AnalyzerViews] = None):
+        self.out = transcript
+        self.reminders = reminders
+        self.views = views
+        self.max_tool_result = max_tool_result
+        self.max_tool_input = max_tool_input
+        self.tool_stats = ToolStats()
+        self.reminder_ids: Dict[str, int] = {}
+        self.tools = Counter()
+        self.models = Counter()
+        self.counts = Counter()
+        self.first: Optional[datetime] = None
+        self.last: Optional[datetime] = None
+        self.meta: Dict[str, str] = {}
+        self.last_message_id = None
+
+    def reminder_marker(self, text: str) -> str:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest not in self.reminder_ids:
+            self.reminder_ids[digest] = len(self.reminder_ids) + 1
+            self.reminders.write(f"### System-reminder #{self.reminder_ids[digest]}\n\n{text.strip()}\n\n")
+            if self.views:
+                self.views.reminder(self.reminder_ids[digest], text)
+        else:
+            self.counts["duplicate_reminders"] += 1
+        return f"[system-reminder #{self.reminder_ids[digest]}]"
+
+    def strip_reminders(self, text: str) -> str:
+        return REMINDER_PATTERN.sub(lambda m: self.reminder_marker(m.group(0)), text)
+
+    def heading(self, role: str, entry: Dict) -> None:
+        timestamp = entry.get("timestamp", "")
+        sidechain = " (sidechain)" if entry.get("isSidechain") else ""
+        self.out.write(f"\n### {role}{sidechain} {timestamp}\n\n")
+
+    def add(self, entry: Dict) -> None:
+        kind = entry.get("type")
+        self.counts["entries"] += 1
+        if kind in SKIPPED_TYPES or kind is None:
+            self.counts["skipped"] += 1
+            return
+
+        stamp = parse_timestamp(entry.get("timestamp"))
+        if stamp:
+            self.first = self.first or stamp
+            self.last = stamp
+        for key in ("sessionId", "slug", "cwd", "gitBranch", "version"):
+            if entry.get(key) and key not in self.meta:
+                self.meta[key] = entry[key]
+
+        if kind == "user":
+            self.add_user(entry, stamp)
+        elif kind == "assistant":
+            self.add_assistant(entry, stamp)
+        elif kind == "attachment":
+            for rendered in entry.get("rendered") or []:
+                text = rendered.get("content") if isinstance(rendered, dict) else None
+                if isinstance(text, str) and "<system-reminder>" in text:
+                    self.out.write(self.strip_reminders(text) + "\n")
+        elif kind == "system":
+            if entry.get("subtype") == "compact_boundary":
+                self.counts["compactions"] += 1
+                self.out.write("\n--- conversation compacted ---\n")
+                if self.views:
+                    self.views.compaction()
+        else:
+            self.counts["skipped"] += 1
+
+    def add_user(self, entry: Dict, stamp: Optional[datetime]) -> None:
+        content = (entry.get("message") or {}).get("content")
+        blocks = content if isinstance(content, list) else [{"type": "text", "text": content or ""}]
+
+        text_parts = []
+        for block in blocks:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "tool_result":
+                self.counts["tool_results"] += 1
+                result = self.strip_reminders(block_text(block.get("content")))
+                error = " (error)" if block.get("is_error") else ""
+                self.out.write(f"← result{error}: {truncate(result, self.max_tool_result)}\n")
+                self.tool_stats.tool_result(block.get("tool_use_id"), result, bool(block.get("is_error")), stamp)
+                if self.views:
+                    self.views.tool_result(result, bool(block.get("is_error")))
+            elif block.get("type") == "text":
+                text_parts.append(block.get("text", ""))
+
+        text = self.strip_reminders("\n".join(text_parts)).strip()
+        if not text:
+            return
+        if entry.get("isCompactSummary"):
+            role = "Compact summary"
+        elif entry.get("isMeta"):
+            role = "Meta"
+        else:
+            role = "User"
+            self.counts["user_messages"] += 1
+            self.tool_stats.user_turn()
+        self.heading(role, entry)
+        self.out.write(text + "\n")
+        if self.views:
+            self.views.user(text, role, entry.get("timestamp", ""))
+
+    def add_assistant(self, entry: Dict, stamp: Optional[datetime]) -> None:
+        message = entry.get("message") or {}
+        # Streamed replies are split over consecutive entries with one message id
+        if message.get("id") != self.last_message_id or not message.get("id"):
+            self.last_message_id = message.get("id")
+            self.counts["assistant_messages"] += 1
+            if message.get("model") and message["model"] != "<synthetic>":
+                self.models[message["model"]] += 1
+            self.heading("Assistant", entry)
+            self.tool_stats.assistant_start()
+            if self.views:
+                self.views.assistant_start(entry.get("timestamp", ""))
+
+        for block in message.get("content") or []:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text" and block.get("text", "").strip():
+                self.out.write(block["text"].strip() + "\n")
+                if self.views:
+                    self.views.assistant_text(block["text"].strip())
+            elif block.get("type") == "tool_use":
+                name = block.get("name", "?")
+                self.tools[name] += 1
+                self.tool_stats.tool_call(block.get("id"), name, block.get("input") or {}, stamp)
+                summary = json.dumps(block.get("input", {}), ensure_ascii=False)
+                self.out.write(f"→ {name} {truncate(summary, self.max_tool_input)}\n")
+                if self.views:
+                    self.views.tool_call(name, summary)
+            elif block.get("type") == "thinking":
+                self.counts["thinking_blocks"] += 1
+
+    def stats(self) -> Dict:
+        duration = (self.last - self.first).total_seconds() if self.first and self.last else 0
+        return {
+            "session_id": self.meta.get("sessionId"),
+            "slug": self.meta.get("slug"),
+            "cwd": self.meta.get("cwd"),
+            "git_branch": self.meta.get("gitBranch"),
+            "claude_code_version": self.meta.get("version"),
+            "first_timestamp": self.first.isoformat() if self.first else None,
+            "last_timestamp": self.last.isoformat() if self.last else None,
+            "duration_seconds": round(duration),
+            "messages": self.counts["user_messages"] + self.counts["assistant_messages"],
+            "user_messages": self.counts["user_messages"],
+            "assistant_messages": self.counts["assistant_messages"],
+            "tool_calls": sum(self.tools.values()),
+            "tool_results": self.counts["tool_results"],
+            "tools_used": dict(self.tools.most_common()),
+            "models": dict(self.models.most_common()),
+            "compactions": self.counts["compactions"],
+            "system_reminders": len(self.reminder_ids),
+            "duplicate_reminders_skipped": self.counts["duplicate_reminders"],
+            "entries": self.counts["entries"],
+        }
+
+
+def format_duration(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m {seconds}s"
+
+
+def format_stats(stats: Dict, persona: Optional[str]) -> str:
+    tools = ", ".join(f"{name} ({count})" for name, count in stats["tools_used"].items()) or "none"
+    models = ", ".join(stats["models"]) or "unknown"
+    lines = [
+        "# Session Context\n",
+        f"- Session: {stats['slug'] or stats['session_id']}",
+        f"- Duration: {format_duration(stats['duration_seconds'])} "
+        f"({stats['first_timestamp']} → {stats['last_timestamp']})",
+        f"- Messages: {stats['messages']} ({stats['user_messages']} user, {stats['assistant_messages']} assistant)",
+        f"- Model: {models}",
+    ]
+    if persona:
+        lines.append(f"- Persona: {persona} (launched via claude-launcher)")
+    lines += [f"- Tools used: {tools}", f"- Compactions: {stats['compactions']}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def write_context(path: Path, stats: Dict, reminders_file: Path, persona: Optional[str]) -> None:
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(format_stats(stats, persona))
+        out.write("## System-Reminders\n\n")
+        out.write("Loaded skills and available tools are listed here. The transcript refers to "
+                  "these blocks as [system-reminder #n].\n\n")
+        with open(reminders_file, encoding="utf-8") as reminders:
+            shutil.copyfileobj(reminders, out)
+
+
+def condense(source: Path, max_tool_result: int, max_tool_input: int, persona: Optional[str] = None,
+             shard_bytes: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    Condense source into the cache (or reuse a cached result) and return the stats with output paths.
+
+    With shard_bytes, the analyzer views are written too, sharded at that
+    many bytes.
+    """
+    stat = source.stat()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    base = CACHE_DIR / source.stem
+    meta_path = base.with_suffix(".json")
+    key = {
+        "version": CACHE_VERSION,
+        "source": str(source.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "max_tool_result": max_tool_result,
+        "max_tool_input": max_tool_input,
+        "persona": persona,
+        "shard_bytes": shard_bytes,
+    }
+
+    if not force and meta_path.exists():
+        try:
+            cached = json.loads(meta_path.read_text())
+            if cached.get("key") == key:
+                return {**cached["result"], "cached": True}
+        except (OSError, ValueError):
+            pass
+
+    transcript_path = Path(f"{base}.transcript.md")
+    context_path = Path(f"{base}.context.md")
+    tool_stats_path = Path(f"{base}.tool-stats.json")
+    views_dir = Path(f"{base}.views")
+    manifest = None
+    with tempfile.TemporaryDirectory(dir=CACHE_DIR) as tmp:
+        tmp_transcript = Path(tmp) / "transcript.md"
+        reminders_file = Path(tmp) / "reminders.md"
+        # Views are written in place, so their paths in the manifest are final
+        shutil.rmtree(views_dir, ignore_errors=True)
+        views = AnalyzerViews(views_dir, shard_bytes) if shard_bytes else None
+        with open(tmp_transcript, "w", encoding="utf-8") as transcript, \
+                open(reminders_file, "w", encoding="utf-8") as reminders:
+            condenser = Condenser(transcript, reminders, max_tool_result, max_tool_input, views)
+            for entry in read_entries(source):
+                condenser.add(entry)
+        stats = condenser.stats()
+        if views:
+            manifest = views.close(format_stats(stats, persona))
+        tmp_context = Path(tmp) / "context.md"
+        write_context(tmp_context, stats, reminders_file, persona)
+        os.replace(tmp_transcript, transcript_path)
+        os.replace(tmp_context, context_path)
+        tool_stats_path.write_text(json.dumps(condenser.tool_stats.summary(), indent=1))
+
+    result = {
+        **stats,
+        "persona": persona,
+        "source": str(source),
+        "source_bytes": stat.st_size,
+        "transcript": str(transcript_path),
+        "transcript_bytes": transcript_path.stat().st_size,
+        "context": str(context_path),
+        "context_bytes": context_path.stat().st_size,
+        "tool_stats": str(tool_stats_path),
+    }
+    if manifest:
+        result["views"] = str(views_dir / "manifest.json")
+        result["shards"] = {name: len(shards) for name, shards in manifest["views"].items()}
+    tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_meta.write_text(json.dumps({"key": key, "result": result}, indent=2))
+    os.replace(tmp_meta, meta_path)
+    prune_cache()
+    return {**result, "cached": False}
+
+
+def prune_cache() -> None:
+    """Keep the CACHE_KEEP most recently condensed sessions."""
+    # <id>.json only: not the tool stats or the session index, which share the directory
+    metas = [p for p in CACHE_DIR.glob("*.json") if "." not in p.stem and p != INDEX_PATH]
+    metas.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for meta in metas[CACHE_KEEP:]:
+        for path in [meta, meta.with_suffix(".transcript.md"), meta.with_suffix(".context.md"),
+                     meta.with_suffix(".tool-stats.json")]:
+            path.unlink(missing_ok=True)
+        shutil.rmtree(meta.with_suffix(".views"), ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Condense a Claude Code session transcript for analysis.")
+    parser.add_argument("session", nargs="?", help="session UUID, slug or .jsonl path (default: most recent)")
+    parser.add_argument("--project-dir", type=Path, help="sessions directory (default: from the current directory)")
+    parser.add_argument("--max-tool-result", type=int, default=500, help="chars kept per tool result (default: 500)")
+    parser.add_argument("--max-tool-input", type=int, default=300, help="chars kept per tool input (default: 300)")
+    parser.add_argument("--views", action="store_true", help="also write sharded per-analyzer views")
+    parser.add_argument("--shard-bytes", type=int, default=80_000,
+                        help="with --views, start a new shard at the next turn past this size (default: 80000)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    args = parser.parse_args()
+
+    # Updated whichever way the session is named, so its launch (persona) is known
+    index = SessionIndex()
+    index.update()
+    source = find_session(args.session, args.project_dir or PROJECTS_DIR / project_name(os.getcwd()), index)
+    # Persona comes from the launcher's launch log, which the index joins by session id
+    persona = (index.data["launches"].get(source.stem) or {}).get("persona")
+    shard_bytes = args.shard_bytes if args.views else None
+    result = condense(source, args.max_tool_result, args.max_tool_input, persona, shard_bytes, args.force)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
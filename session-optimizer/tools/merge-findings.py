@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Merge Findings - Combines the per-shard findings of the four analyzers into
+one numbered list, deterministically.
+
+After condense-session.py --views, each analyzer runs once per shard of its
+view. Save each response next to its shard as shard-NNN.findings.md; this
+script then reads them in manifest order and:
+
+- parses every `### N. Title` finding and its **Impact:** line
+- drops duplicates (same title, ignoring case and punctuation), keeping
+  the most detailed one; overlapping shards often report the same issue
+- sorts by impact (high, medium, low), then analyzer, shard and original
+  position, and renumbers from 1
+
+The same inputs always produce the same report.
+
+Usage:
+    python3 merge-findings.py <views>/manifest.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from analyzer_views import VIEWS
+
+FINDING_HEADING = re.compile(r"^###\s+\d+\.\s+(.+?)\s*$")
+IMPACT = re.compile(r"\*\*Impact:\*\*\s*\[?(high|medium|low)", re.IGNORECASE)
+IMPACT_ORDER = ["high", "medium", "low", "unrated"]
+
+
+def parse_findings(text: str) -> List[Dict]:
+    """Split an analyzer response into findings (title, body, impact)."""
+    findings = []
+    current = None
+    for line in text.splitlines():
+        heading = FINDING_HEADING.match(line)
+        if heading:
+            current = {"title": heading.group(1), "lines": []}
+            findings.append(current)
+        elif current is not None:
+            current["lines"].append(line)
+
+    for finding in findings:
+        body = "\n".join(finding.pop("lines")).strip()
+        impact = IMPACT.search(body)
+        finding["body"] = body
+        finding["impact"] = impact.group(1).lower() if impact else "unrated"
+    return findings
+
+
+def title_key(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+
+
+def collect(manifest: Dict) -> List[Dict]:
+    """Every finding from every saved shard response, in manifest order."""
+    findings = []
+    for analyzer_rank, analyzer in enumerate(VIEWS):
+        for shard_rank, shard in enumerate(manifest["views"].get(analyzer, [])):
+            path = Path(shard["path"]).with_suffix(".findings.md")
+            if not path.exists():
+                print(f"⚠ Missing {path}", file=sys.stderr)
+                continue
+            for position, finding in enumerate(parse_findings(path.read_text(encoding="utf-8"))):
+                findings.append({
+                    **finding,
+                    "analyzer": analyzer,
+                    "shard": shard_rank + 1,
+                    "order": (analyzer_rank, shard_rank, position),
+                })
+    return findings
+
+
+def merge(findings: List[Dict]) -> List[Dict]:
+    """Deduplicate by title (keep the longest body) and sort by impact, then source order."""
+    kept: Dict[str, Dict] = {}
+    for finding in findings:
+        key = title_key(finding["title"])
+        current = kept.get(key)
+        if current is None:
+            kept[key] = {**finding, "duplicates": 0}
+        elif len(finding["body"]) > len(current["body"]):
+            kept[key] = {**finding, "duplicates": current["duplicates"] + 1}
+        else:
+            current["duplicates"] += 1
+    merged = list(kept.values())
+    merged.sort(key=lambda f: (IMPACT_ORDER.index(f["impact"]), f["order"]))
+    return merged
+
+
+def render(merged: List[Dict]) -> str:
+    lines = ["## Findings", ""]
+    for number, finding in enumerate(merged, 1):
+        also = f", also reported {finding['duplicates']}× elsewhere" if finding["duplicates"] else ""
+        lines += [
+            f"### {number}. {finding['title']}",
+            "",
+            f"**Source:** {finding['analyzer']}, shard {finding['shard']}{also}",
+            finding["body"],
+            "",
+        ]
+    counts = {impact: sum(1 for f in merged if f["impact"] == impact) for impact in IMPACT_ORDER}
+    unrated = f", {counts['unrated']} unrated" if counts["unrated"] else ""
+    lines += [
+        "---",
+        "",
+        f"**Total findings:** {len(merged)} ({counts['high']} high, {counts['medium']} medium, "
+        f"{counts['low']} low impact{unrated})",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge per-shard analyzer findings into one report.")
+    parser.add_argument("manifest", type=Path, help="manifest.json written by condense-session.py --views")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    print(render(merge(collect(manifest))), end="")
+
+
+if __name__ == "__main__":
+    main()
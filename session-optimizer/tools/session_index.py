@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Session Index - A persistent index of every Claude Code session transcript
+under ~/.claude/projects, for lookups without scanning history.
+
+Each transcript's entry records its id, slug, path, project, cwd,
+first/last timestamp, message count and, for sessions started by
+claude-launcher, the persona and model (joined from the launcher's
+launches.jsonl by session id).
+
+Updates are incremental: a transcript is only read if its size or mtime
+changed, and then only from the offset where the previous update stopped.
+A file that shrank, or whose first or last indexed line no longer matches,
+was rewritten and is re-read from the start.
+
+The index is compact JSON in ~/.cache/session-optimizer/session-index.json
+(or $XDG_CACHE_HOME/session-optimizer/). condense-session.py uses it to
+resolve slugs and ids.
+
+Usage:
+    python3 session_index.py lookup <uuid|slug>
+    python3 session_index.py list [--project PATH] [--limit N]
+    python3 session_index.py personas
+    python3 session_index.py update [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECTS_DIR = Path.home() / ".claude" / "projects"
+XDG_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+INDEX_PATH = XDG_CACHE / "session-optimizer" / "session-index.json"
+LAUNCH_LOG = XDG_CACHE / "claude-launcher" / "launches.jsonl"
+INDEX_VERSION = 2
+
+
+def tail_lines(path: Path, offset: int):
+    """
+    Yield (raw line, end_offset) for each complete line after offset.
+
+    A trailing line without a newline is still being written; it is left
+    for the next update.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                return
+            offset += len(raw)
+            yield raw, offset
+
+
+def new_entry(path: Path) -> Dict:
+    return {
+        "id": path.stem,
+        "slug": None,
+        "path": str(path),
+        "project": path.parent.name,
+        "cwd": None,
+        "first": None,
+        "last": None,
+        "messages": 0,
+        "user_messages": 0,
+        "size": 0,
+        "mtime_ns": 0,
+        "offset": 0,
+        # Hashes of the first and last line read, to detect in-place rewrites
+        "head": None,
+        "tail": None,
+        "tail_bytes": 0,
+        "last_message_id": None,
+    }
+
+
+def line_hash(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def unchanged_prefix(entry: Dict, path: Path, size: int) -> bool:
+    """Whether the bytes indexed so far are still there: same first and last line, file not shrunk."""
+    if size < entry["offset"] or not entry["head"]:
+        return False
+    with open(path, "rb") as f:
+        if line_hash(f.readline()) != entry["head"]:
+            return False
+        f.seek(entry["offset"] - entry["tail_bytes"])
+        return line_hash(f.read(entry["tail_bytes"])) == entry["tail"]
+
+
+def scan_transcript(entry: Dict, path: Path) -> None:
+    """Fold the lines after entry["offset"] into entry."""
+    for raw, offset in tail_lines(path, entry["offset"]):
+        if entry["offset"] == 0:
+            entry["head"] = line_hash(raw)
+        entry["offset"] = offset
+        entry["tail"] = line_hash(raw)
+        entry["tail_bytes"] = len(raw)
+        try:
+            record = json.loads(raw.decode("utf-8", errors="replace"))
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+
+        timestamp = record.get("timestamp")
+        if timestamp:
+            entry["first"] = entry["first"] or timestamp
+            entry["last"] = timestamp
+        if record.get("slug") and not entry["slug"]:
+            entry["slug"] = record["slug"]
+        if record.get("cwd") and not entry["cwd"]:
+            entry["cwd"] = record["cwd"]
+
+        kind = record.get("type")
+        message = record.get("message") if isinstance(record.get("message"), dict) else {}
+        if kind == "assistant":
+            # Streamed replies span consecutive lines with one message id
+            if message.get("id") != entry["last_message_id"] or not message.get("id"):
+                entry["last_message_id"] = message.get("id")
+                entry["messages"] += 1
+        elif kind == "user" and not record.get("isMeta") and not record.get("isCompactSummary"):
+            content = message.get("content")
+            if isinstance(content, str) or any(
+                    isinstance(block, dict) and block.get("type") == "text" for block in content or []):
+                entry["messages"] += 1
+                entry["user_messages"] += 1
+
+
+class SessionIndex:
+    """Load, incrementally update and query the session index."""
+
+    def __init__(self, index_path: Path = INDEX_PATH, projects_dir: Path = PROJECTS_DIR,
+                 launch_log: Path = LAUNCH_LOG):
+        self.index_path = index_path
+        self.projects_dir = projects_dir
+        self.launch_log = launch_log
+        self.data = self._load()
+        self._by_key: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict:
+        try:
+            data = json.loads(self.index_path.read_text())
+            if data.get("version") == INDEX_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"version": INDEX_VERSION, "sessions": {}, "launches": {}, "launch_log_offset": 0}
+
+    def update(self) -> Dict[str, int]:
+        """Bring the index up to date; returns counts of read/unchanged/removed transcripts."""
+        sessions = self.data["sessions"]
+        seen = set()
+        counts = {"read": 0, "unchanged": 0, "removed": 0}
+
+        try:
+            projects = [p for p in os.scandir(self.projects_dir) if p.is_dir()]
+        except FileNotFoundError:
+            projects = []
+        for project in projects:
+            for item in os.scandir(project.path):
+                if not item.name.endswith(".jsonl") or not item.is_file():
+                    continue
+                stat = item.stat()
+                seen.add(item.path)
+                entry = sessions.get(item.path)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    counts["unchanged"] += 1
+                    continue
+                # Appended: continue from the offset. Shrunk or rewritten: start over.
+                path = Path(item.path)
+                if not entry or stat.st_size <= entry["size"] or not unchanged_prefix(entry, path, stat.st_size):
+                    entry = new_entry(path)
+                scan_transcript(entry, path)
+                entry["size"] = stat.st_size
+                entry["mtime_ns"] = stat.st_mtime_ns
+                sessions[item.path] = entry
+                counts["read"] += 1
+
+        for path in [p for p in sessions if p not in seen]:
+            del sessions[path]
+            counts["removed"] += 1
+
+        self._update_launches()
+        if counts["read"] or counts["removed"] or self._launches_changed:
+            self._save()
+        self._by_key = None
+        return counts
+
+    def _update_launches(self) -> None:
+        """Tail the launcher's launch log into {session_id: launch}."""
+        self._launches_changed = False
+        try:
+            size = self.launch_log.stat().st_size
+        except OSError:
+            return
+        if size < self.data["launch_log_offset"]:
+            self.data["launches"] = {}
+            self.data["launch_log_offset"] = 0
+        for raw, offset in tail_lines(self.launch_log, self.data["launch_log_offset"]):
+            self.data["launch_log_offset"] = offset
+            self._launches_changed = True
+            try:
+                launch = json.loads(raw.decode("utf-8", errors="replace"))
+                self.data["launches"][launch["session_id"]] = {
+                    "persona": launch.get("persona"), "model": launch.get("model")}
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.data, separators=(",", ":")))
+        os.replace(tmp, self.index_path)
+
+    def session(self, entry: Dict) -> Dict:
+        """Public view of an entry, with the launcher persona if known."""
+        launch = self.data["launches"].get(entry["id"], {})
+        view = {key: entry[key] for key in
+                ("id", "slug", "path", "project", "cwd", "first", "last", "messages", "user_messages")}
+        return {**view, "persona": launch.get("persona"), "model": launch.get("model")}
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Find a session by UUID or slug (the most recent one if a slug repeats)."""
+        if self._by_key is None:
+            self._by_key = {}
+            for entry in sorted(self.data["sessions"].values(), key=lambda e: e["last"] or ""):
+                self._by_key[entry["id"]] = entry
+                if entry["slug"]:
+                    self._by_key[entry["slug"]] = entry
+        entry = self._by_key.get(key)
+        return self.session(entry) if entry else None
+
+    def sessions(self, project: Optional[str] = None) -> List[Dict]:
+        """All sessions, most recent first, optionally for one project directory name."""
+        entries = [e for e in self.data["sessions"].values() if project is None or e["project"] == project]
+        entries.sort(key=lambda e: e["last"] or "", reverse=True)
+        return [self.session(e) for e in entries]
+
+    def persona_usage(self) -> List[Dict]:
+        """Sessions and messages per launcher persona, most used first."""
+        usage: Dict[str, Dict] = {}
+        for session in self.sessions():
+            persona = session["persona"] or "(not launched via claude-launcher)"
+            row = usage.setdefault(persona, {"persona": persona, "sessions": 0, "messages": 0, "last": None})
+            row["sessions"] += 1
+            row["messages"] += session["messages"]
+            row["last"] = max(row["last"] or "", session["last"] or "") or None
+        return sorted(usage.values(), key=lambda r: (r["sessions"], r["messages"]), reverse=True)
+
+
+def project_name(cwd: str) -> str:
+    """Claude Code stores a project's sessions under its path with non-alphanumerics replaced by '-'."""
+    return "".join(c if c.isalnum() else "-" for c in cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index Claude Code session transcripts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    lookup = sub.add_parser("lookup", help="find a session by UUID or slug")
+    lookup.add_argument("key")
+    listing = sub.add_parser("list", help="list sessions, most recent first")
+    listing.add_argument("--project", help="only sessions started in this directory")
+    listing.add_argument("--limit", type=int, default=20)
+    sub.add_parser("personas", help="sessions and messages per launcher persona")
+    update = sub.add_parser("update", help="update the index")
+    update.add_argument("--rebuild", action="store_true", help="discard the index and re-read everything")
+    args = parser.parse_args()
+
+    if args.command == "update" and args.rebuild:
+        INDEX_PATH.unlink(missing_ok=True)
+    index = SessionIndex()
+    counts = index.update()
+
+    if args.command == "update":
+        print(f"{len(index.data['sessions'])} sessions indexed: {counts['read']} read, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed ({INDEX_PATH})")
+    elif args.command == "lookup":
+        session = index.lookup(args.key)
+        if not session:
+            sys.exit(f"✗ No session with id or slug '{args.key}'")
+        print(json.dumps(session, indent=2))
+    elif args.command == "list":
+        project = project_name(str(Path(args.project).resolve())) if args.project else None
+        for session in index.sessions(project)[:args.limit]:
+            print(f"{session['last'] or '-':<26} {session['messages']:>6}  {session['slug'] or session['id']:<32} "
+                  f"{session['persona'] or ''}")
+    elif args.command == "personas":
+        print(f"{'persona':<40} {'sessions':>8} {'messages':>9}  last used")
+        for row in index.persona_usage():
+            print(f"{row['persona']:<40} {row['sessions']:>8} {row['messages']:>9}  {row['last'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Tests for where analyzer_views splits a view into shards.
+
+Run from this directory: python3 -m pytest test_analyzer_views.py
+(or python3 -m unittest test_analyzer_views).
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from analyzer_views import MID_TURN_FACTOR, AnalyzerViews
+
+BUDGET = 1000
+VIEW = "conversation-efficiency-analyzer"
+
+
+def render(turns):
+    """Feed turns (lists of assistant message texts) through AnalyzerViews; return VIEW's shards."""
+    with tempfile.TemporaryDirectory() as tmp:
+        views = AnalyzerViews(Path(tmp), BUDGET)
+        for messages in turns:
+            views.user("u" * 50, "User", "t")
+            for text in messages:
+                views.assistant_start("t")
+                views.assistant_text(text)
+        shards = views.close("stats")["views"][VIEW]
+        for shard in shards:
+            shard["heading"] = Path(shard["path"]).read_text(encoding="utf-8").splitlines()[0]
+        return shards
+
+
+class ShardBoundaryTest(unittest.TestCase):
+    def test_long_turn_splits_only_past_the_ceiling(self):
+        # Turn 1 runs to ~7 budgets of assistant messages; turn 2 is one short exchange
+        shards = render([["a" * 300] * 20, ["b" * 100]])
+
+        continued = [s for s in shards if "continued" in s["heading"]]
+        self.assertTrue(continued, "a long turn should be split")
+        self.assertTrue(all(s["first_turn"] == 1 for s in continued))
+        for shard, following in zip(shards, shards[1:]):
+            if "continued" in following["heading"]:
+                self.assertGreaterEqual(shard["bytes"], BUDGET * MID_TURN_FACTOR)
+                self.assertLess(shard["bytes"], BUDGET * MID_TURN_FACTOR + 400)
+        self.assertEqual(shards[-1]["last_turn"], 2)
+
+    def test_turn_between_budget_and_ceiling_stays_whole(self):
+        # Turn 1 passes the budget but not the ceiling; turns 2 and 3 are short
+        shards = render([["a" * 300] * 4, ["b" * 100], ["c" * 100]])
+
+        self.assertEqual([s["heading"] for s in shards],
+                         ["# Shard 1 (from turn 1)", "# Shard 2 (from turn 2)"])
+        self.assertGreater(shards[0]["bytes"], BUDGET)
+        self.assertEqual((shards[0]["first_turn"], shards[0]["last_turn"]), (1, 1))
+        self.assertEqual((shards[1]["first_turn"], shards[1]["last_turn"]), (2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+"""
+Tool Stats - Exact tool-usage metrics for a session transcript.
+
+Fed by condense-session.py's streaming pass, so the numbers cost no extra
+read of the transcript. Written to <id>.tool-stats.json for the
+tool-and-skill-usage analyzer, which then quotes exact counts instead of
+estimating them from the text:
+
+- per tool: calls, errors, retries right after an error, output bytes,
+  and seconds from call to result
+- seconds between tool calls in consecutive assistant messages
+- identical calls (same tool, same input) made more than once
+- files read more than once, and re-reads with no edit in between
+- error streaks: the same tool failing several times in a row
+- calls per assistant message, and runs of single read-only calls in
+  consecutive messages that could have been one parallel batch
+
+Turns are numbered like the analyzer views: a turn starts at each user
+message. Edits made through Bash are not seen, so an "unchanged" re-read
+is a strong hint rather than proof.
+"""
+
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Tools whose calls are independent lookups, safe to batch in one message
+READ_ONLY_TOOLS = {"Read", "Grep", "Glob", "LS", "WebFetch", "WebSearch"}
+EDIT_TOOLS = {"Edit", "MultiEdit", "Write", "NotebookEdit"}
+
+# Entries kept in each of the ranked lists
+TOP = 10
+MIN_SEQUENTIAL_RUN = 3
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+
+def input_file(tool_input: Dict) -> Optional[str]:
+    path = tool_input.get("file_path") or tool_input.get("notebook_path")
+    return path if isinstance(path, str) else None
+
+
+class ToolStats:
+    """Accumulates tool metrics from condenser events; summary() returns the JSON-ready result."""
+
+    def __init__(self):
+        self.tools: Dict[str, Counter] = {}
+        self.latency: Dict[str, List[float]] = {}
+        self.pending: Dict[str, Dict] = {}
+        self.gaps: List[float] = []
+        self.last_call: Optional[datetime] = None
+        self.turn = 0
+        # Identical calls: digest of tool + input → {tool, input, count, turns}
+        self.inputs: Dict[str, Dict] = {}
+        # Files: path → {reads, unchanged_rereads, edits}; path → whether edited since the last read
+        self.files: Dict[str, Counter] = {}
+        self.edited_since_read: Dict[str, bool] = {}
+        self.error_run: Dict[str, Dict] = {}
+        self.error_streaks: List[Dict] = []
+        self.last_failed: Optional[str] = None
+        self.largest: List[Dict] = []
+        # Calls per assistant message, and the current run of single read-only calls
+        self.message_calls: Optional[List[str]] = None
+        self.batch_sizes = Counter()
+        self.run: Optional[Dict] = None
+        self.sequential_runs: List[Dict] = []
+
+    def user_turn(self) -> None:
+        self._end_message()
+        self._end_run()
+        self.turn += 1
+
+    def assistant_start(self) -> None:
+        self._end_message()
+        self.message_calls = []
+
+    def tool_call(self, tool_id: Optional[str], name: str, tool_input: Dict, stamp: Optional[datetime]) -> None:
+        counts = self.tools.setdefault(name, Counter())
+        counts["calls"] += 1
+        if self.last_failed == name:
+            counts["retries_after_error"] += 1
+        self.last_failed = None
+        # Gaps are between messages: calls batched in one message share a timestamp
+        if stamp and self.last_call and not self.message_calls:
+            self.gaps.append((stamp - self.last_call).total_seconds())
+        self.last_call = stamp or self.last_call
+        if self.message_calls is not None:
+            self.message_calls.append(name)
+
+        canonical = json.dumps(tool_input, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha1(f"{name}\0{canonical}".encode("utf-8")).hexdigest()
+        seen = self.inputs.get(digest)
+        if seen is None:
+            self.inputs[digest] = {"tool": name, "input": canonical[:200], "count": 1, "turns": [self.turn]}
+        else:
+            seen["count"] += 1
+            if seen["turns"][-1] != self.turn:
+                seen["turns"].append(self.turn)
+
+        path = input_file(tool_input) if isinstance(tool_input, dict) else None
+        if path and name == "Read":
+            file_counts = self.files.setdefault(path, Counter())
+            file_counts["reads"] += 1
+            if file_counts["reads"] > 1 and not self.edited_since_read.get(path):
+                file_counts["unchanged_rereads"] += 1
+            self.edited_since_read[path] = False
+        elif path and name in EDIT_TOOLS:
+            self.files.setdefault(path, Counter())["edits"] += 1
+            self.edited_since_read[path] = True
+
+        if tool_id:
+            self.pending[tool_id] = {"name": name, "stamp": stamp, "input": canonical[:200], "turn": self.turn}
+
+    def tool_result(self, tool_id: Optional[str], text: str, is_error: bool, stamp: Optional[datetime]) -> None:
+        call = self.pending.pop(tool_id, None) if tool_id else None
+        if call is None:
+            return
+        name = call["name"]
+        counts = self.tools[name]
+        size = len(text.encode("utf-8"))
+        counts["output_bytes"] += size
+        counts["max_output_bytes"] = max(counts["max_output_bytes"], size)
+        if stamp and call["stamp"]:
+            self.latency.setdefault(name, []).append((stamp - call["stamp"]).total_seconds())
+
+        if len(self.largest) < TOP or size > self.largest[-1]["bytes"]:
+            self.largest.append({"tool": name, "bytes": size, "turn": call["turn"], "input": call["input"]})
+            self.largest.sort(key=lambda r: -r["bytes"])
+            del self.largest[TOP:]
+
+        run = self.error_run.get(name)
+        if is_error:
+            counts["errors"] += 1
+            self.last_failed = name
+            if run is None:
+                self.error_run[name] = {"tool": name, "errors": 1, "turn": call["turn"]}
+            else:
+                run["errors"] += 1
+        elif run is not None:
+            self._end_error_run(name)
+
+    def _end_error_run(self, name: str) -> None:
+        run = self.error_run.pop(name)
+        if run["errors"] > 1:
+            self.error_streaks.append(run)
+
+    def _end_message(self) -> None:
+        calls, self.message_calls = self.message_calls, None
+        if not calls:
+            return
+        self.batch_sizes[len(calls)] += 1
+        if len(calls) == 1 and calls[0] in READ_ONLY_TOOLS:
+            if self.run is None:
+                self.run = {"turn": self.turn, "messages": 0, "tools": Counter()}
+            self.run["messages"] += 1
+            self.run["tools"][calls[0]] += 1
+        else:
+            self._end_run()
+
+    def _end_run(self) -> None:
+        run, self.run = self.run, None
+        if run and run["messages"] >= MIN_SEQUENTIAL_RUN:
+            self.sequential_runs.append({**run, "tools": dict(run["tools"])})
+
+    def summary(self) -> Dict:
+        self._end_message()
+        self._end_run()
+        for name in list(self.error_run):
+            self._end_error_run(name)
+
+        tools = {}
+        for name, counts in sorted(self.tools.items(), key=lambda item: -item[1]["calls"]):
+            latency = self.latency.get(name, [])
+            tools[name] = {
+                "calls": counts["calls"],
+                "errors": counts["errors"],
+                "retries_after_error": counts["retries_after_error"],
+                "output_bytes": counts["output_bytes"],
+                "max_output_bytes": counts["max_output_bytes"],
+                "seconds_to_result": {
+                    "total": round(sum(latency), 1),
+                    "median": percentile(latency, 0.5),
+                    "max": round(max(latency), 1) if latency else None,
+                },
+            }
+
+        repeated = sorted((i for i in self.inputs.values() if i["count"] > 1),
+                          key=lambda i: (-i["count"], i["turns"][0]))
+        files = sorted(({"path": path, **counts} for path, counts in self.files.items() if counts["reads"] > 1),
+                       key=lambda f: (-f["reads"], f["path"]))
+        streaks = sorted(self.error_streaks, key=lambda s: (-s["errors"], s["turn"]))
+        runs = sorted(self.sequential_runs, key=lambda r: (-r["messages"], r["turn"]))
+        messages = sum(self.batch_sizes.values())
+        return {
+            "tool_calls": sum(c["calls"] for c in self.tools.values()),
+            "tool_errors": sum(c["errors"] for c in self.tools.values()),
+            "output_bytes": sum(c["output_bytes"] for c in self.tools.values()),
+            "unanswered_calls": len(self.pending),
+            "tools": tools,
+            "seconds_between_calls": {
+                "median": percentile(self.gaps, 0.5),
+                "p90": percentile(self.gaps, 0.9),
+                "max": round(max(self.gaps), 1) if self.gaps else None,
+            },
+            "repeated_calls": {
+                "distinct": len(repeated),
+                "extra_calls": sum(i["count"] - 1 for i in repeated),
+                "top": repeated[:TOP],
+            },
+            "files_read_repeatedly": {
+                "files": len(files),
+                "unchanged_rereads": sum(f["unchanged_rereads"] for f in files),
+                "top": files[:TOP],
+            },
+            "error_streaks": streaks[:TOP],
+            "largest_outputs": self.largest,
+            "batching": {
+                "messages_with_tools": messages,
+                "parallel_messages": messages - self.batch_sizes[1],
+                "max_calls_per_message": max(self.batch_sizes, default=0),
+                "sequential_read_only_runs": len(runs),
+                "top_sequential_runs": runs[:TOP],
+            },
+        }